@@ -0,0 +1,80 @@
+"""
+Benchmarks for the hot paths of sending sponsor emails.
+
+Run with `python -m benchmarks --output results.json`
+"""
+
+import click
+import json
+import multiprocessing
+from pathlib import Path
+import platform
+import typing as t
+
+from .cases import BENCHMARKS, child
+
+
+@click.command(help="Benchmark rendering, sheet parsing, and sending")
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Where to save the results as JSON",
+    default=None,
+)
+@click.option(
+    "-b",
+    "--benchmark",
+    "names",
+    type=click.Choice(list(BENCHMARKS.keys())),
+    multiple=True,
+    help="The benchmarks to run, defaults to all",
+)
+@click.option("--messages", default=2000, help="The number of messages to send")
+@click.option("--rows", default=50000, help="The number of rows in the large sheet")
+@click.option("--paragraphs", default=200, help="The number of template paragraphs")
+@click.option(
+    "--email-paragraphs",
+    default=12,
+    help="The number of template paragraphs when sending",
+)
+@click.option("--iterations", default=20, help="Repetitions for repeated benchmarks")
+@click.option("--latency", default=0.05, help="Seconds of simulated MailGun latency")
+@click.option("--concurrency", default=16, help="Messages to send at once")
+@click.option(
+    "--startup-budget",
+    default=0.5,
+    help="The most seconds the CLI may take to start, compared against the median",
+)
+def main(output: t.Optional[Path], names: t.Tuple[str, ...], **options):
+    context = multiprocessing.get_context("spawn")
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "options": options,
+        "results": {},
+    }
+    for name in names or BENCHMARKS.keys():
+        results = context.Queue()
+        process = context.Process(target=child, args=(name, options, results))
+        process.start()
+        process.join()
+        if process.exitcode != 0:
+            raise click.ClickException(f"benchmark {name} failed")
+
+        result = results.get()
+
+        report["results"][name] = result
+        click.echo(
+            f"{name:>10}: {result['per_second']:>12.1f}/s  "
+            f"p50 {result['p50_ms']:>9.3f}ms  p99 {result['p99_ms']:>9.3f}ms  "
+            f"peak {result['peak_rss_kb'] / 1024:>7.1f}MiB"
+        )
+
+    if output is not None:
+        output.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
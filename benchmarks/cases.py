@@ -0,0 +1,279 @@
+"""
+The benchmark cases, each of which is run in its own process so its peak memory usage can be measured
+"""
+
+from contextlib import redirect_stdout
+import multiprocessing
+import os
+from pathlib import Path
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+from threading import Thread
+import time
+import typing as t
+
+from . import stubs, synthetic
+
+# Dependencies which must not be imported just to start the CLI
+SLOW_IMPORTS = (
+    "gdoc",
+    "google.auth",
+    "googleapiclient",
+    "gspread",
+    "httpx",
+    "mailgun",
+    "pydantic",
+    "requests",
+)
+
+
+def summarize(durations: t.List[float], total: float) -> t.Dict[str, float]:
+    """
+    Summarize the timings of a benchmark
+    :param durations: how long each operation took in seconds
+    :param total: the wall-clock time for all the operations in seconds
+    :return: the throughput and latency percentiles
+    """
+    ordered = sorted(durations)
+    return {
+        "count": len(ordered),
+        "seconds": total,
+        "per_second": len(ordered) / total if total > 0 else 0.0,
+        "p50_ms": statistics.median(ordered) * 1000 if ordered else 0.0,
+        "p99_ms": ordered[int(len(ordered) * 0.99)] * 1000 if ordered else 0.0,
+    }
+
+
+def peak_rss_kb() -> int:
+    """Get the peak resident set size of the current process in kilobytes"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def bench_render(options: t.Dict[str, t.Any]) -> t.Dict[str, t.Any]:
+    """Render personalized messages from a compiled template"""
+    import gdoc
+    from sponsor_emails.config import TemplatePlaceholders
+    from sponsor_emails.sender import Template
+
+    placeholders = TemplatePlaceholders()
+    document = gdoc.Document.parse_obj(synthetic.document(options["paragraphs"]))
+    text, html = Template.from_document(document, placeholders)
+
+    durations = []
+    start = time.perf_counter()
+    for row in range(options["messages"]):
+        values = TemplatePlaceholders(
+            company_name=f"Company {row}",
+            contact_name=f"Contact {row}",
+            sender_name="Sender Name",
+        )
+
+        began = time.perf_counter()
+        text.render(values)
+        html.render(values)
+        durations.append(time.perf_counter() - began)
+
+    return summarize(durations, time.perf_counter() - start)
+
+
+def bench_document(options: t.Dict[str, t.Any]) -> t.Dict[str, t.Any]:
+    """Convert a large document to plaintext and HTML"""
+    import gdoc
+
+    raw = synthetic.document(options["paragraphs"])
+
+    durations = []
+    html_bytes = 0
+    start = time.perf_counter()
+    for _ in range(options["iterations"]):
+        document = gdoc.Document.parse_obj(raw)
+
+        began = time.perf_counter()
+        document.text
+        html_bytes = len(document.html.encode())
+        durations.append(time.perf_counter() - began)
+
+    result = summarize(durations, time.perf_counter() - start)
+    result["html_bytes"] = html_bytes
+    return result
+
+
+def bench_sheets(options: t.Dict[str, t.Any]) -> t.Dict[str, t.Any]:
+    """Fetch and clean the sponsors data from a large sheet"""
+    from sponsor_emails import sheets
+
+    spreadsheets = {
+        "sponsors": stubs.Spreadsheet(
+            "sponsors", {"Sponsors": synthetic.sponsors(options["rows"])}
+        )
+    }
+    client = stubs.SheetsClient(spreadsheets)
+    url = "https://docs.google.com/spreadsheets/d/sponsors/edit"
+
+    durations = []
+    start = time.perf_counter()
+    for _ in range(options["iterations"]):
+        began = time.perf_counter()
+        (sponsors,) = sheets.load_sheets(client, [sheets.SheetRange(url, "Sponsors")])
+        columns = sheets.map_headers(sponsors.headers, synthetic.SPONSOR_HEADERS)
+        sheets.select_columns(sponsors.rows, list(columns.dict().values()))
+        durations.append(time.perf_counter() - began)
+
+    return summarize(durations, time.perf_counter() - start)
+
+
+def bench_send(options: t.Dict[str, t.Any]) -> t.Dict[str, t.Any]:
+    """Send every message end to end against stubbed services and the MailGun stand-in"""
+    import click
+    import gdoc
+    from google.auth.credentials import AnonymousCredentials
+    import gspread
+    import mailgun
+    from mailgun.server import Settings, StandInServer
+    from sponsor_emails import Config
+    from sponsor_emails.config import Credentials
+    from sponsor_emails.sender import run
+
+    # Start the MailGun stand-in
+    server = StandInServer(("127.0.0.1", 0), Settings(latency=options["latency"]))
+    Thread(target=server.serve_forever, daemon=True).start()
+
+    # Stub out the Google services
+    spreadsheets = {
+        "sponsors": stubs.Spreadsheet(
+            "sponsors", {"Sponsors": synthetic.sponsors(options["messages"])}
+        ),
+        "senders": stubs.Spreadsheet("senders", {"Senders": synthetic.senders()}),
+    }
+    documents = stubs.DocsClient(synthetic.document(options["email_paragraphs"]))
+    gdoc.authorize = lambda *_, **__: documents
+    gspread.authorize = lambda *_, **__: stubs.SheetsClient(spreadsheets)
+    Credentials.gcp = lambda *_: AnonymousCredentials()
+    click.confirm = lambda *_, **__: True
+
+    # Time each message sent
+    durations = []
+    send = mailgun.MailGun.send
+
+    def timed(self, *args, **kwargs):
+        began = time.perf_counter()
+        try:
+            return send(self, *args, **kwargs)
+        finally:
+            durations.append(time.perf_counter() - began)
+
+    mailgun.MailGun.send = timed
+
+    with tempfile.TemporaryDirectory() as directory:
+        service_account = Path(directory) / "service-account.json"
+        service_account.write_text("{}")
+
+        cfg = Config.parse_obj(
+            {
+                "credentials": {
+                    "gcp_service_account": str(service_account),
+                    "mailgun_domain": "sponsors.example",
+                    "mailgun_api_key": "key",
+                    "mailgun_base_url": f"http://127.0.0.1:{server.server_port}/v3",
+                },
+                "senders": {
+                    "url": "https://docs.google.com/spreadsheets/d/senders/edit",
+                    "sheet": "Senders",
+                    "reply_to": "sponsors@sponsors.example",
+                },
+                "sponsors": {
+                    "url": "https://docs.google.com/spreadsheets/d/sponsors/edit",
+                    "sheet": "Sponsors",
+                    "package": None,
+                    "headers": synthetic.SPONSOR_HEADERS.dict(),
+                    "statuses": {},
+                },
+                "template": {
+                    "url": "https://docs.google.com/document/d/template/edit",
+                    "placeholders": {},
+                },
+            }
+        )
+
+        start = time.perf_counter()
+        success, skipped, total = run(
+            cfg,
+            False,
+            False,
+            None,
+            0,
+            None,
+            concurrency=options["concurrency"],
+        )
+        elapsed = time.perf_counter() - start
+
+    server.shutdown()
+
+    result = summarize(durations, elapsed)
+    result["success"] = success
+    result["skipped"] = skipped
+    result["total"] = total
+    result["bytes_uploaded"] = server.stats.bytes
+    return result
+
+
+def bench_startup(options: t.Dict[str, t.Any]) -> t.Dict[str, t.Any]:
+    """
+    Start the CLI to show its help, failing if starting it imports any of the dependencies which are slow to import or
+    if the median start takes longer than the budget
+    """
+    # Check what importing the CLI loads in a fresh interpreter
+    check = (
+        "import sys, sponsor_emails.cli; "
+        f"print(' '.join(m for m in {SLOW_IMPORTS!r} if m in sys.modules))"
+    )
+    loaded = subprocess.run(
+        [sys.executable, "-c", check], capture_output=True, check=True, text=True
+    ).stdout.split()
+    if loaded:
+        raise RuntimeError(f"starting the CLI imports {', '.join(loaded)}")
+
+    durations = []
+    start = time.perf_counter()
+    for _ in range(options["iterations"]):
+        began = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "sponsor_emails.cli", "--help"],
+            capture_output=True,
+            check=True,
+        )
+        durations.append(time.perf_counter() - began)
+
+    result = summarize(durations, time.perf_counter() - start)
+    if result["p50_ms"] > options["startup_budget"] * 1000:
+        raise RuntimeError(
+            f"starting the CLI took {result['p50_ms']:.0f}ms, "
+            f"over the budget of {options['startup_budget'] * 1000:.0f}ms"
+        )
+    return result
+
+
+BENCHMARKS = {
+    "render": bench_render,
+    "document": bench_document,
+    "sheets": bench_sheets,
+    "send": bench_send,
+    "startup": bench_startup,
+}
+
+
+def child(name: str, options: t.Dict[str, t.Any], results: multiprocessing.Queue):
+    """
+    Run a benchmark in a child process
+    :param name: the name of the benchmark
+    :param options: the benchmark options
+    :param results: where to put the result
+    """
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        result = BENCHMARKS[name](options)
+    result["peak_rss_kb"] = peak_rss_kb()
+    results.put(result)
@@ -0,0 +1,169 @@
+"""
+In-memory stand-ins for the Google Docs and Google Sheets clients used by `sponsor_emails.sender.run`
+"""
+
+import re
+import typing as t
+
+import gdoc
+from sponsor_emails import sheets
+
+RANGE_RE = re.compile(r"^([A-Z]+)(\d+)?:([A-Z]+)(\d+)?$")
+ROWS_RE = re.compile(r"^(\d+):(\d+)$")
+ABSOLUTE_RE = re.compile(r"^'((?:[^']|'')+)'(?:!(.+))?$")
+
+
+class Worksheet(object):
+    """A worksheet backed by a list of rows"""
+
+    def __init__(self, spreadsheet: "Spreadsheet", title: str, values: t.List[list]):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.values = values
+        self.row_count = len(values) + 1000
+        self.calls = 0
+
+    def row_values(self, row: int) -> t.List[str]:
+        self.calls += 1
+        return list(self.values[row - 1])
+
+    def batch_get(self, ranges: t.List[str]) -> t.List[t.List[t.List[str]]]:
+        self.calls += 1
+        return [self.get(r) for r in ranges]
+
+    def batch_update(self, data: t.List[t.Dict[str, t.Any]], **_):
+        self.calls += 1
+        for update in data:
+            match = RANGE_RE.match(update["range"])
+            column = sheets.label_to_index(match.group(1))
+            start = int(match.group(2))
+            for offset, (value,) in enumerate(update["values"]):
+                row = self.values[start + offset - 1]
+                row[column] = value
+
+    def get(self, a1: t.Optional[str]) -> t.List[t.List[str]]:
+        """
+        Get the values in a range, or the whole worksheet
+        :param a1: the range without the worksheet title
+        :return: the values in the range
+        """
+        if a1 is None:
+            return self.__trim([list(row) for row in self.values])
+
+        rows = ROWS_RE.match(a1)
+        if rows is not None:
+            start, end = int(rows.group(1)), int(rows.group(2))
+            return self.__trim([list(row) for row in self.values[start - 1 : end]])
+
+        match = RANGE_RE.match(a1)
+        first = sheets.label_to_index(match.group(1))
+        last = sheets.label_to_index(match.group(3))
+        start = int(match.group(2) or 1)
+        end = int(match.group(4) or len(self.values))
+
+        return self.__trim(
+            [row[first : last + 1] for row in self.values[start - 1 : end]]
+        )
+
+    @staticmethod
+    def __trim(rows: t.List[t.List[str]]) -> t.List[t.List[str]]:
+        """The API trims empty trailing rows and cells"""
+        result = []
+        for row in rows:
+            cells = list(row)
+            while cells and cells[-1] in ("", None):
+                cells.pop()
+            result.append(cells)
+        while result and len(result[-1]) == 0:
+            result.pop()
+        return result
+
+
+class Spreadsheet(object):
+    """A spreadsheet holding named worksheets"""
+
+    def __init__(self, key: str, sheets: t.Dict[str, t.List[list]]):
+        self.id = key
+        self.client = None
+        self.version = 1
+        self.sheets = {
+            title: Worksheet(self, title, values) for title, values in sheets.items()
+        }
+        self.calls = 0
+
+    def worksheet(self, title: str) -> Worksheet:
+        return self.sheets[title]
+
+    def values_batch_get(self, ranges: t.List[str]) -> t.Dict[str, t.Any]:
+        self.calls += 1
+        value_ranges = []
+        for a1 in ranges:
+            title, within = self.__split(a1)
+            value_ranges.append({"range": a1, "values": self.sheets[title].get(within)})
+        return {"spreadsheetId": self.id, "valueRanges": value_ranges}
+
+    def values_batch_update(self, body: t.Dict[str, t.Any]):
+        self.calls += 1
+        self.version += 1
+        for update in body["data"]:
+            title, within = self.__split(update["range"])
+            self.sheets[title].batch_update([dict(update, range=within)])
+
+    @staticmethod
+    def __split(a1: str) -> t.Tuple[str, t.Optional[str]]:
+        """Split an absolute range into the worksheet title and the range within it"""
+        match = ABSOLUTE_RE.match(a1)
+        return match.group(1).replace("''", "'"), match.group(2)
+
+
+class SheetsClient(object):
+    """A gspread client which opens in-memory spreadsheets by URL"""
+
+    def __init__(self, spreadsheets: t.Dict[str, Spreadsheet]):
+        self.spreadsheets = spreadsheets
+        for spreadsheet in spreadsheets.values():
+            spreadsheet.client = self
+
+    def request(self, method: str, endpoint: str, **_) -> "Response":
+        """Answer Google Drive requests for a spreadsheet's version"""
+        spreadsheet = self.spreadsheets[endpoint.rsplit("/", 1)[-1]]
+        spreadsheet.calls += 1
+        return Response({"version": str(spreadsheet.version)})
+
+    def open_by_key(self, key: str) -> Spreadsheet:
+        return self.spreadsheets[key]
+
+    def open_by_url(self, url: str) -> Spreadsheet:
+        for key, spreadsheet in self.spreadsheets.items():
+            if key in url:
+                return spreadsheet
+        raise KeyError(url)
+
+
+class Response(object):
+    """A response with a JSON body"""
+
+    def __init__(self, body: t.Dict[str, t.Any]):
+        self.body = body
+
+    def json(self) -> t.Dict[str, t.Any]:
+        return self.body
+
+
+class DocsClient(object):
+    """A gdoc client which always opens the same raw document"""
+
+    def __init__(self, raw: t.Dict[str, t.Any]):
+        self.raw = raw
+        self.calls = 0
+
+    def revision(self, _: str) -> str:
+        self.calls += 1
+        return self.raw["revisionId"]
+
+    def open(self, _: str) -> gdoc.Document:
+        self.calls += 1
+        return gdoc.Document.parse_obj(self.raw)
+
+    def open_by_url(self, url: str) -> gdoc.Document:
+        return self.open(url)
@@ -0,0 +1,157 @@
+import random
+import string
+import typing as t
+
+from sponsor_emails.config import SponsorsHeaders
+
+WORDS = [
+    "".join(random.Random(i).choices(string.ascii_lowercase, k=3 + i % 7))
+    for i in range(512)
+]
+
+SPONSOR_HEADERS = SponsorsHeaders()
+SENDER_HEADER = "Name"
+
+
+def paragraph(rng: random.Random, words: int, placeholders: t.List[str]) -> str:
+    """
+    Generate a paragraph of text with some placeholders mixed in
+    :param rng: the source of randomness
+    :param words: the number of words in the paragraph
+    :param placeholders: the placeholders to mix in
+    :return: the paragraph text
+    """
+    chosen = rng.choices(WORDS, k=words)
+    for placeholder in placeholders:
+        chosen[rng.randrange(len(chosen))] = placeholder
+    return " ".join(chosen) + "\n"
+
+
+def document(
+    paragraphs: int,
+    runs_per_paragraph: int = 6,
+    placeholders: t.Sequence[str] = ("{COMPANY}", "{RECIPIENT}", "{SENDER}"),
+    seed: int = 0,
+) -> t.Dict[str, t.Any]:
+    """
+    Generate a raw Google Docs API document with many styled text runs
+    :param paragraphs: the number of paragraphs
+    :param runs_per_paragraph: the number of differently styled runs in each paragraph
+    :param placeholders: the placeholders to include in the first paragraph
+    :param seed: the seed for the source of randomness
+    :return: the raw document
+    """
+    rng = random.Random(seed)
+    styles = [
+        {},
+        {"bold": True},
+        {"italic": True},
+        {"fontSize": {"magnitude": 11, "unit": "PT"}},
+        {
+            "weightedFontFamily": {"fontFamily": "Arial", "weight": 400},
+            "foregroundColor": {"color": {"rgbColor": {"red": 0.2, "blue": 0.4}}},
+        },
+        {"link": {"url": "https://wafflehacks.tech"}, "underline": True},
+    ]
+
+    content = [
+        {
+            "endIndex": 1,
+            "sectionBreak": {
+                "sectionStyle": {
+                    "columnSeparatorStyle": "NONE",
+                    "sectionType": "CONTINUOUS",
+                }
+            },
+        }
+    ]
+    index = 1
+    for number in range(paragraphs):
+        elements = []
+        for run in range(runs_per_paragraph):
+            last = run == runs_per_paragraph - 1
+            text = paragraph(
+                rng, 12, list(placeholders) if number == 0 and run == 0 else []
+            )
+            text = text if last else text[:-1] + " "
+
+            elements.append(
+                {
+                    "startIndex": index,
+                    "endIndex": index + len(text),
+                    "textRun": {"content": text, "textStyle": rng.choice(styles)},
+                }
+            )
+            index += len(text)
+
+        content.append(
+            {
+                "startIndex": elements[0]["startIndex"],
+                "endIndex": index,
+                "paragraph": {
+                    "elements": elements,
+                    "paragraphStyle": {"namedStyleType": "NORMAL_TEXT"},
+                },
+            }
+        )
+
+    return {
+        "title": "Sponsorship",
+        "revisionId": "revision",
+        "suggestionsViewMode": "SUGGESTIONS_INLINE",
+        "documentId": "document",
+        "body": {"content": content},
+        "namedStyles": {
+            "styles": [
+                {
+                    "namedStyleType": "NORMAL_TEXT",
+                    "paragraphStyle": {"namedStyleType": "NORMAL_TEXT"},
+                    "textStyle": {
+                        "fontSize": {"magnitude": 11, "unit": "PT"},
+                        "weightedFontFamily": {"fontFamily": "Arial", "weight": 400},
+                    },
+                }
+            ]
+        },
+    }
+
+
+def sponsors(rows: int, pending: float = 0.9, seed: int = 0) -> t.List[t.List[str]]:
+    """
+    Generate the rows of a sponsors sheet, including the header row
+    :param rows: the number of sponsors
+    :param pending: the fraction of sponsors that haven't been sent to
+    :param seed: the seed for the source of randomness
+    :return: the sheet values
+    """
+    rng = random.Random(seed)
+    values = [
+        [
+            SPONSOR_HEADERS.company_name,
+            "Notes",
+            SPONSOR_HEADERS.contact_name,
+            SPONSOR_HEADERS.contact_email,
+            SPONSOR_HEADERS.sent_status,
+        ]
+    ]
+    for row in range(rows):
+        status = "Pending" if rng.random() < pending else "Waiting for Response"
+        values.append(
+            [
+                f"Company {row}",
+                " ".join(rng.choices(WORDS, k=4)),
+                f"Contact {row}",
+                f"contact{row}@company{row}.example",
+                status,
+            ]
+        )
+    return values
+
+
+def senders(rows: int = 20) -> t.List[t.List[str]]:
+    """
+    Generate the rows of a senders sheet, including the header row
+    :param rows: the number of senders
+    :return: the sheet values
+    """
+    return [[SENDER_HEADER]] + [[f"Sender Number{row}"] for row in range(rows)]
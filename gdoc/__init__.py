@@ -1,14 +1,17 @@
 from .client import Client
+from .template import Segments, Template
+from .transport import SessionHttp
 from .types import Document
 from .utils import NoValidIdFound
 
 
-def authorize(credentials, client_class=Client):
+def authorize(credentials, client_class=Client, **options):
     """
     Login to the Google API using OAuth2 credentials.
     This is a shortcut function which instantiates `client_class`. By default :class:`gdoc.Client` is used.
     :param credentials: Google OAuth2 credentials
     :param client_class: the class to instantiate
+    :param options: extra options for the client, such as `session`
     :return: `client_class` instance
     """
-    return client_class(credentials)
+    return client_class(credentials, **options)
@@ -1,45 +1,101 @@
 from googleapiclient.discovery import build
+import requests
 import typing as t
 
 from .auth import convert_credentials
+from .transport import SessionHttp
 from .types import Document, SuggestionsViewMode
 from .utils import extract_document_id
 
+# The parts of a document used when converting it to text and HTML
+DEFAULT_FIELDS = ",".join(
+    [
+        "documentId",
+        "title",
+        "revisionId",
+        "suggestionsViewMode",
+        "body/content(startIndex,endIndex,"
+        "paragraph(paragraphStyle/namedStyleType,elements(startIndex,endIndex,textRun(content,textStyle))))",
+        "namedStyles/styles(namedStyleType,paragraphStyle/namedStyleType,textStyle)",
+    ]
+)
+
 
 class Client(object):
     """A light-weight, typed wrapper around the Google Docs API"""
 
-    def __init__(self, auth: t.Any):
+    def __init__(self, auth: t.Any, session: t.Optional[requests.Session] = None):
+        """
+        :param auth: the credentials to authenticate with
+        :param session: an authorized session to make requests with instead of opening new connections
+        """
         credentials = convert_credentials(auth)
-        self.service = build("docs", "v1", credentials=credentials)
+
+        # Use the discovery document bundled with the library rather than fetching or caching it
+        options = {"static_discovery": True, "cache_discovery": False}
+        if session is None:
+            options["credentials"] = credentials
+        else:
+            options["http"] = SessionHttp(session)
+        self.service = build("docs", "v1", **options)
 
     def open(
         self,
         document_id: str,
         view_mode: SuggestionsViewMode = SuggestionsViewMode.DEFAULT_FOR_CURRENT_ACCESS,
+        fields: t.Optional[str] = DEFAULT_FIELDS,
     ) -> Document:
         """
         Open a document by its ID
         :param document_id: the document id
         :param view_mode: how to open the document
+        :param fields: a field mask selecting the parts of the document to fetch, or `None` for all of it
         :return: the document data
         """
         raw = (
             self.service.documents()
-            .get(documentId=document_id, suggestionsViewMode=view_mode.value)
+            .get(
+                documentId=document_id,
+                suggestionsViewMode=view_mode.value,
+                fields=fields,
+            )
             .execute()
         )
         return Document.parse_obj(raw)
 
+    def revision(
+        self,
+        document_id: str,
+        view_mode: SuggestionsViewMode = SuggestionsViewMode.DEFAULT_FOR_CURRENT_ACCESS,
+    ) -> str:
+        """
+        Get the current revision of a document without fetching its content
+        :param document_id: the document id
+        :param view_mode: how to open the document
+        :return: the revision id
+        """
+        raw = (
+            self.service.documents()
+            .get(
+                documentId=document_id,
+                suggestionsViewMode=view_mode.value,
+                fields="revisionId",
+            )
+            .execute()
+        )
+        return raw["revisionId"]
+
     def open_by_url(
         self,
         url: str,
         view_mode: SuggestionsViewMode = SuggestionsViewMode.DEFAULT_FOR_CURRENT_ACCESS,
+        fields: t.Optional[str] = DEFAULT_FIELDS,
     ) -> Document:
         """
         Open a document by its full URL
         :param url: the URL to the document
         :param view_mode: how to open the document
+        :param fields: a field mask selecting the parts of the document to fetch, or `None` for all of it
         :return: the document data
         """
-        return self.open(extract_document_id(url), view_mode)
+        return self.open(extract_document_id(url), view_mode, fields)
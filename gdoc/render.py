@@ -0,0 +1,233 @@
+import re
+import typing as t
+
+from .template import Segments, Template
+
+if t.TYPE_CHECKING:
+    from .types import Document, Paragraph, TextStyle
+
+# The opening and closing HTML around some text
+Wrappers = t.Tuple[str, str]
+
+
+class Slot(t.NamedTuple):
+    """Where a placeholder was found in the content"""
+
+    placeholder: str
+
+
+# The pieces of converted content, either literal text or placeholders
+Chunk = t.List[t.Union[str, Slot]]
+
+
+def render(document: "Document") -> t.Tuple[str, str]:
+    """
+    Convert a document to plaintext and HTML in a single pass over its content
+    :param document: the document to convert
+    :return: the plaintext and HTML respectively
+    """
+    text = []  # type: t.List[str]
+    html = []  # type: t.List[str]
+    for text_chunk, html_chunk in chunks(document):
+        text.extend(text_chunk)
+        html.extend(html_chunk)
+
+    return "".join(text), "".join(html)
+
+
+def compile_template(document: "Document", placeholders: t.Iterable[str]) -> Template:
+    """
+    Convert a document to plaintext and HTML with slots where the placeholders are. Placeholders are found in the
+    text of each paragraph, so they are still found when split across differently styled runs. The whole placeholder
+    takes the style of its first character.
+    :param document: the document to convert
+    :param placeholders: the placeholders to find
+    :return: the compiled template
+    """
+    placeholders = sorted(placeholders, key=len, reverse=True)
+    pattern = None
+    if len(placeholders) != 0:
+        pattern = re.compile("|".join(re.escape(p) for p in placeholders))
+
+    text = []  # type: Chunk
+    html = []  # type: Chunk
+    for text_chunk, html_chunk in chunks(document, pattern):
+        text.extend(text_chunk)
+        html.extend(html_chunk)
+
+    return Template(segment(text), segment(html))
+
+
+def segment(chunk: Chunk) -> Segments:
+    """
+    Split converted content into literal parts and slots
+    :param chunk: the converted content
+    :return: the parts and slots
+    """
+    parts = []  # type: t.List[str]
+    slots = []  # type: t.List[t.Tuple[int, str]]
+
+    literal = []  # type: t.List[str]
+    for piece in chunk:
+        if isinstance(piece, Slot):
+            parts.append("".join(literal))
+            slots.append((len(parts), piece.placeholder))
+            parts.append("")
+            literal = []
+        else:
+            literal.append(piece)
+    parts.append("".join(literal))
+
+    return Segments(parts, slots)
+
+
+def chunks(
+    document: "Document", pattern: t.Optional[t.Pattern] = None
+) -> t.Iterator[t.Tuple[Chunk, Chunk]]:
+    """
+    Convert a document one paragraph at a time
+    :param document: the document to convert
+    :param pattern: matches the placeholders to replace with slots
+    :return: the plaintext and HTML of each paragraph
+    """
+    styles = document.namedStyles.style_map
+
+    # The opening paragraph tag for each named style, which sets the CSS inherited by all its text
+    openings = {}  # type: t.Dict[str, str]
+
+    # The HTML wrappers for each distinct pair of run and named style
+    wrappers = {}  # type: t.Dict[t.Tuple[t.Hashable, str], Wrappers]
+
+    for structural_element in document.body.content:
+        # Ignore section breaks
+        if structural_element.paragraph is None:
+            continue
+
+        paragraph = structural_element.paragraph
+        named_style_type = paragraph.paragraphStyle.namedStyleType
+        parent = styles[named_style_type].textStyle
+
+        if named_style_type not in openings:
+            css = parent.inherited().css()
+            openings[named_style_type] = f'<p style="{css}">' if css else "<p>"
+
+        yield convert_paragraph(
+            paragraph, parent, openings[named_style_type], wrappers, pattern
+        )
+
+
+def convert_paragraph(
+    paragraph: "Paragraph",
+    parent: "TextStyle",
+    opening: str,
+    wrappers: t.Dict[t.Tuple[t.Hashable, str], Wrappers],
+    pattern: t.Optional[t.Pattern] = None,
+) -> t.Tuple[Chunk, Chunk]:
+    """
+    Convert a single paragraph, merging adjacent runs which resolve to the same wrappers
+    :param paragraph: the paragraph to convert
+    :param parent: the text style of the paragraph's named style
+    :param opening: the opening paragraph tag
+    :param wrappers: the already resolved wrappers, which are added to
+    :param pattern: matches the placeholders to replace with slots
+    :return: the plaintext and HTML of the paragraph
+    """
+    named_style_type = paragraph.paragraphStyle.namedStyleType
+
+    # Resolve the wrappers for each run
+    runs = []  # type: t.List[t.Tuple[Wrappers, t.Union[str, Slot]]]
+    for element in paragraph.elements:
+        if element.textRun is None:
+            continue
+
+        key = (element.textRun.textStyle.key(), named_style_type)
+        if key not in wrappers:
+            merged = element.textRun.textStyle.merge(parent)
+            wrappers[key] = merged.difference(parent.inherited()).wrappers()
+
+        runs.append((wrappers[key], element.textRun.content))
+
+    if pattern is not None:
+        runs = find_placeholders(runs, pattern)
+
+    text = []  # type: Chunk
+    html = [opening]  # type: Chunk
+
+    current = ("", "")
+    contents = []  # type: Chunk
+    for run_wrappers, content in runs:
+        if run_wrappers != current:
+            wrap(html, contents, current)
+            current = run_wrappers
+            contents = []
+
+        text.append(content)
+        contents.append(content)
+
+    wrap(html, contents, current)
+    html.append("</p>")
+
+    return text, html
+
+
+def find_placeholders(
+    runs: t.List[t.Tuple[Wrappers, str]], pattern: t.Pattern
+) -> t.List[t.Tuple[Wrappers, t.Union[str, Slot]]]:
+    """
+    Split the runs of a paragraph around the placeholders in its text, even where a placeholder spans multiple runs
+    :param runs: the wrappers and text of each run
+    :param pattern: matches the placeholders
+    :return: the runs with each placeholder replaced by a slot in the run it starts in
+    """
+    text = "".join(content for _, content in runs)
+    matches = pattern.finditer(text)
+    match = next(matches, None)
+    if match is None:
+        return runs
+
+    pieces = []  # type: t.List[t.Tuple[Wrappers, t.Union[str, Slot]]]
+    position = 0
+    end = 0
+    for run_wrappers, content in runs:
+        end += len(content)
+
+        # Anything before the current position was part of a placeholder from an earlier run
+        while position < end:
+            if match is not None and match.start() < end:
+                if position < match.start():
+                    pieces.append((run_wrappers, text[position : match.start()]))
+                pieces.append((run_wrappers, Slot(match.group())))
+
+                position = match.end()
+                match = next(matches, None)
+            else:
+                pieces.append((run_wrappers, text[position:end]))
+                position = end
+
+    return pieces
+
+
+def wrap(html: Chunk, contents: Chunk, wrappers: Wrappers):
+    """
+    Join the contents of adjacent runs and add them to the HTML surrounded by their wrappers
+    :param html: the HTML being built
+    :param contents: the text of each run
+    :param wrappers: the opening and closing HTML shared by the runs
+    """
+    if len(contents) == 0:
+        return
+
+    opening, closing = wrappers
+    html.append(opening)
+
+    literal = []  # type: t.List[str]
+    for content in contents:
+        if isinstance(content, Slot):
+            html.append("".join(literal).replace("\n", "<br>"))
+            html.append(content)
+            literal = []
+        else:
+            literal.append(content)
+    html.append("".join(literal).replace("\n", "<br>"))
+
+    html.append(closing)
@@ -0,0 +1,17 @@
+import typing as t
+
+
+class Segments(t.NamedTuple):
+    """Converted content split into literal parts around the placeholders it contains"""
+
+    # The literal parts, with an empty string where each slot goes
+    parts: t.List[str]
+    # The index of each slot in the parts and the placeholder found there
+    slots: t.List[t.Tuple[int, str]]
+
+
+class Template(t.NamedTuple):
+    """A document converted to plaintext and HTML with slots where its placeholders are"""
+
+    text: Segments
+    html: Segments
@@ -0,0 +1,59 @@
+import httplib2
+import requests
+import typing as t
+
+
+class SessionHttp(object):
+    """
+    Adapts a requests session to the httplib2 interface used by the Google API client, so requests can go through a
+    pooled session shared with other clients
+    """
+
+    def __init__(self, session: requests.Session):
+        """
+        :param session: the authorized session to make requests with
+        """
+        self.session = session
+
+    def request(
+        self,
+        uri: str,
+        method: str = "GET",
+        body: t.Optional[t.Union[str, bytes]] = None,
+        headers: t.Optional[t.Dict[str, str]] = None,
+        redirections: int = 5,
+        connection_type: t.Any = None,
+    ) -> t.Tuple[httplib2.Response, bytes]:
+        """
+        Make a request
+        :param uri: the URL to request
+        :param method: the HTTP method
+        :param body: the request body
+        :param headers: the request headers
+        :param redirections: the maximum number of redirects to follow
+        :param connection_type: unused, connections are managed by the session
+        :return: the response and its content
+        """
+        response = self.session.request(
+            method,
+            uri,
+            data=body,
+            headers=headers,
+            allow_redirects=redirections > 0,
+        )
+
+        # The content has already been decoded by requests
+        info = {
+            key: value
+            for key, value in response.headers.items()
+            if key.lower() != "content-encoding"
+        }
+        info["status"] = str(response.status_code)
+
+        result = httplib2.Response(info)
+        result.reason = response.reason
+        return result, response.content
+
+    def close(self):
+        """Close the underlying session"""
+        self.session.close()
@@ -2,6 +2,8 @@ from enum import Enum
 from pydantic import BaseModel, PrivateAttr
 import typing as t
 
+from ..render import compile_template, render
+from ..template import Template
 from .styling import ParagraphStyle, NamedStyle, NamedStyleType, SectionStyle, TextStyle
 
 
@@ -36,33 +38,15 @@ class Document(BaseModel):
         """
         Get the content from the document
         """
-        text = ""
-        html = ""
+        self._text, self._html = render(self)
 
-        styles = self.namedStyles.style_map
-
-        for structural_element in self.body.content:
-            # Ignore section breaks
-            if structural_element.paragraph is None:
-                continue
-
-            # Get the parent style
-            paragraph = structural_element.paragraph
-            paragraph_style = styles[paragraph.paragraphStyle.namedStyleType]
-
-            # Add the content
-            html_segment = "<p>"
-            for element in paragraph.elements:
-                content = element.textRun.content
-                text_style = element.textRun.textStyle.merge(paragraph_style.textStyle)
-
-                text += content
-                html_segment += text_style.apply(content).replace("\n", "<br>")
-
-            html += html_segment + "</p>"
-
-        self._text = text
-        self._html = html
+    def compile(self, placeholders: t.Iterable[str]) -> Template:
+        """
+        Convert the document with slots where the placeholders are, including placeholders split across runs
+        :param placeholders: the placeholders to find
+        :return: the compiled template
+        """
+        return compile_template(self, placeholders)
 
 
 class SuggestionsViewMode(str, Enum):
@@ -108,12 +92,12 @@ class Paragraph(BaseModel):
 
 class ParagraphElement(BaseModel):
     """
-    Content within a paragraph
+    Content within a paragraph. Only text runs are supported, other kinds of content such as inline images are ignored.
     """
 
     startIndex: int
     endIndex: int
-    textRun: "TextRun"
+    textRun: t.Optional["TextRun"]
 
 
 class TextRun(BaseModel):
@@ -143,7 +127,7 @@ class NamedStyles(BaseModel):
 
     styles: t.List[NamedStyle]
 
-    _style_map: t.Dict[NamedStyleType, NamedStyle] = PrivateAttr(default={})
+    _style_map: t.Dict[NamedStyleType, NamedStyle] = PrivateAttr(default_factory=dict)
 
     @property
     def style_map(self) -> t.Dict[NamedStyleType, NamedStyle]:
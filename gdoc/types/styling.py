@@ -5,6 +5,9 @@ import typing as t
 from .color import OptionalColor
 from .units import Direction, Dimension
 
+# The text style fields whose CSS properties are inherited by nested elements
+INHERITED_FIELDS = ("fontSize", "weightedFontFamily", "foregroundColor")
+
 
 class TextStyle(BaseModel):
     """
@@ -29,14 +32,41 @@ class TextStyle(BaseModel):
         :param style: the style to merge with
         :return: a new combined style
         """
-        result = self.copy()  # type: TextStyle
+        inherited = {
+            field: getattr(style, field)
+            for field in self.__fields__.keys()
+            if getattr(self, field) is None
+        }
+        return self.copy(update=inherited)
+
+    def key(self) -> t.Hashable:
+        """
+        Get a value which is equal for equal styles and cheap to hash and compare, for caching resolved styles
+        :return: the style's values as nested tuples
+        """
+        return freeze(self)
 
-        for field in self.__fields__.keys():
-            if getattr(result, field) is None:
-                new = getattr(style, field)
-                setattr(result, field, new)
+    def inherited(self) -> "TextStyle":
+        """
+        Get only the parts of the style which are inherited by nested elements when set on a containing element
+        :return: a new style with only the inherited fields set
+        """
+        return self.construct(
+            **{field: getattr(self, field) for field in INHERITED_FIELDS}
+        )
 
-        return result
+    def difference(self, style: "TextStyle") -> "TextStyle":
+        """
+        Remove the fields which only restate the values in another style
+        :param style: the style to compare against
+        :return: a new style without the repeated fields
+        """
+        repeated = {
+            field: None
+            for field in self.__fields__.keys()
+            if getattr(self, field) == getattr(style, field)
+        }
+        return self.copy(update=repeated)
 
     def apply(self, text: str) -> str:
         """
@@ -44,34 +74,55 @@ class TextStyle(BaseModel):
         :param text: the text to apply the style to
         :return: the formatted text
         """
-        result = text
-        css = ""
+        opening, closing = self.wrappers()
+        return opening + text + closing
+
+    def wrappers(self) -> t.Tuple[str, str]:
+        """
+        Get the HTML that surrounds text with this style
+        :return: the opening and closing HTML respectively
+        """
+        tags = []  # type: t.List[t.Tuple[str, str]]
 
-        # Add HTML properties
+        # Add HTML properties, from innermost to outermost
         if self.underline:
-            result = f"<u>{result}</u>"
+            tags.append(("<u>", "</u>"))
         if self.italic:
-            result = f"<i>{result}</i>"
+            tags.append(("<i>", "</i>"))
         if self.bold:
-            result = f"<b>{result}</b>"
+            tags.append(("<b>", "</b>"))
         if self.strikethrough:
-            result = f"<s>{result}</s>"
+            tags.append(("<s>", "</s>"))
         if self.link:
-            result = f'<a href="{self.link.href}" target="_blank">{result}</a>'
+            tags.append((f'<a href="{self.link.href}" target="_blank">', "</a>"))
         if self.smallCaps:
-            result = f"<small>{result}</small>"
+            tags.append(("<small>", "</small>"))
         if self.baselineOffset == BaselineOffset.SUBSCRIPT:
-            result = f"<sub>{result}</sub>"
+            tags.append(("<sub>", "</sub>"))
         if self.baselineOffset == BaselineOffset.SUPERSCRIPT:
-            result = f"<sup>{result}</sup>"
+            tags.append(("<sup>", "</sup>"))
 
-        # Add CSS properties
+        # Add the CSS to a span if needed
+        css = self.css()
+        if css != "":
+            tags.append((f'<span style="{css}">', "</span>"))
+
+        opening = "".join(opening for opening, _ in reversed(tags))
+        closing = "".join(closing for _, closing in tags)
+        return opening, closing
+
+    def css(self) -> str:
+        """
+        Get the CSS properties for this style
+        :return: the CSS declarations
+        """
+        css = ""
         if self.fontSize:
             css += f"font-size: {self.fontSize.magnitude};"
         if self.weightedFontFamily:
             css += (
                 f"font-weight: {self.weightedFontFamily.weight};"
-                f'font-family: "{self.weightedFontFamily.fontFamily}", serif;'
+                f"font-family: '{self.weightedFontFamily.fontFamily}', serif;"
             )
         if self.foregroundColor:
             if self.foregroundColor.color:
@@ -81,12 +132,20 @@ class TextStyle(BaseModel):
             if self.backgroundColor.color:
                 color = self.backgroundColor.color.rgbColor
                 css += f"background-color: rgb({color.red},{color.blue},{color.green});"
+        return css
 
-        # Add the CSS to a span if needed
-        if css != "":
-            result = f'<span style="{css}">{result}</span>'
 
-        return result
+def freeze(value: t.Any) -> t.Hashable:
+    """
+    Convert a model into nested tuples of its values
+    :param value: the model or value to convert
+    :return: the hashable equivalent
+    """
+    if isinstance(value, BaseModel):
+        return tuple(freeze(field) for field in value.__dict__.values())
+    elif isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
 
 
 class ParagraphStyle(BaseModel):
@@ -1,18 +1,45 @@
 from requests.auth import HTTPBasicAuth as __HTTPBasicAuth
 from typing import Union as __Union
 
-from .client import MailGun
+from .aio import AsyncMailGun
+from .client import BATCH_LIMIT, MailGun
 from .errors import *
+from .types import Attachment
+from .usage import Usage
 
 
 def authorize(
-    credentials: __Union[__HTTPBasicAuth, str], domain: str, client_class=MailGun
+    credentials: __Union[__HTTPBasicAuth, str],
+    domain: str,
+    client_class=MailGun,
+    **options,
 ):
     """
     Login to the MailGun API using the specified credentials
     :param credentials: the API key to login with
     :param domain: the sending domain
     :param client_class: the class to instantiate
+    :param options: extra options for the client, such as `rate_limit` and `retries`
     :return: `client_class` instance
     """
-    return client_class(credentials, domain)
+    return client_class(credentials, domain, **options)
+
+
+def authorize_async(
+    credentials: __Union[__HTTPBasicAuth, str],
+    domain: str,
+    max_connections: int = 100,
+    client_class=AsyncMailGun,
+    **options,
+):
+    """
+    Login to the MailGun API using the specified credentials for use with asyncio. This must be called from within
+    the event loop the client will be used on.
+    :param credentials: the API key to login with
+    :param domain: the sending domain
+    :param max_connections: the maximum number of pooled connections
+    :param client_class: the class to instantiate
+    :param options: extra options for the client, such as `rate_limit` and `retries`
+    :return: `client_class` instance
+    """
+    return client_class(credentials, domain, max_connections, **options)
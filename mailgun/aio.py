@@ -0,0 +1,183 @@
+import asyncio
+import httpx
+from requests.auth import HTTPBasicAuth
+import typing as t
+
+from .client import (
+    BASE_URL,
+    DEFAULT_RETRIES,
+    build_message,
+    check_status,
+    parse_response,
+)
+from .errors import MailGunException, TooManyRequestsException
+from .ratelimit import RateLimiter, backoff
+from .types import Attachment, Domain, QueuedMessage
+from .usage import Usage
+
+
+class AsyncMailGun(object):
+    """A light-weight, typed wrapper around the MailGun v3 API using asyncio"""
+
+    def __init__(
+        self,
+        auth: t.Union[HTTPBasicAuth, str],
+        domain: str,
+        max_connections: int = 100,
+        rate_limit: t.Optional[float] = None,
+        retries: int = DEFAULT_RETRIES,
+        base_url: str = BASE_URL,
+        timeout: httpx.Timeout = httpx.Timeout(5.0),
+        keepalive_expiry: float = 5.0,
+    ):
+        """
+        :param auth: the API key to login with
+        :param domain: the sending domain
+        :param max_connections: the maximum number of pooled connections
+        :param rate_limit: the maximum number of requests per second
+        :param retries: the number of times to retry a request which failed transiently or could not connect
+        :param base_url: the URL of the API
+        :param timeout: how long to wait when connecting and for responses
+        :param keepalive_expiry: how many seconds idle connections are kept open for
+        """
+        if isinstance(auth, str):
+            auth = HTTPBasicAuth("api", auth)
+
+        self.domain = domain
+        self.base_url = base_url.rstrip("/")
+        self.client = httpx.AsyncClient(
+            auth=(auth.username, auth.password),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=timeout,
+        )
+
+        self.limiter = RateLimiter(rate_limit)
+        self.retries = retries
+        self.usage = Usage()
+
+    async def __aenter__(self) -> "AsyncMailGun":
+        return self
+
+    async def __aexit__(self, *_):
+        await self.close()
+
+    async def close(self):
+        """Close all the pooled connections"""
+        await self.client.aclose()
+
+    async def __request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Make a rate limited request, retrying if it fails transiently
+        :param method: the HTTP method
+        :param url: the URL to request
+        :param kwargs: any arguments to pass to the client
+        :return: the successful response
+        """
+        attempt = 0
+        while True:
+            await asyncio.sleep(self.limiter.reserve())
+
+            try:
+                response = await self.client.request(method, url, **kwargs)
+                self.usage.request(response.request.headers.get("Content-Length"))
+                check_status(response.status_code, response.headers.get("Retry-After"))
+                self.limiter.recover()
+                return response
+            except TooManyRequestsException as e:
+                self.limiter.throttle(e.retry_after)
+                if attempt >= self.retries:
+                    raise
+                delay = max(backoff(attempt), e.retry_after or 0)
+            except MailGunException as e:
+                if not e.transient or attempt >= self.retries:
+                    raise
+                delay = max(backoff(attempt), e.retry_after or 0)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout):
+                # Anything which fails after connecting may have already been delivered
+                if attempt >= self.retries:
+                    raise
+                delay = backoff(attempt)
+
+            attempt += 1
+            self.usage.retry()
+            await asyncio.sleep(delay)
+
+    async def info(self) -> Domain:
+        """Get information about the current domain"""
+        response = await self.__request("GET", f"{self.base_url}/domains/{self.domain}")
+        return parse_response(Domain, response)
+
+    async def send(
+        self,
+        from_: str,
+        to: t.List[str],
+        subject: str,
+        text: str,
+        html: str = None,
+        files: t.List[t.Union[Attachment, t.BinaryIO]] = None,
+        headers: t.Dict[str, str] = None,
+    ) -> QueuedMessage:
+        """
+        Send a MIME email
+        :param from_: who the email is from
+        :param to: the email recipient(s)
+        :param subject: the email subject
+        :param text: the plaintext content
+        :param html: optional HTML content (if the recipient client supports it)
+        :param files: attachments to the message
+        :param headers: extra headers to be added to the message
+        :return: the queued message information
+        """
+        body, attachments = build_message(
+            from_, to, subject, text, html, files, headers
+        )
+
+        # Send the request
+        response = await self.__request(
+            "POST",
+            f"{self.base_url}/{self.domain}/messages",
+            files=attachments or None,
+            data=body,
+        )
+        return parse_response(QueuedMessage, response)
+
+    async def send_batch(
+        self,
+        from_: str,
+        to: t.List[str],
+        subject: str,
+        text: str,
+        recipient_variables: t.Dict[str, t.Dict[str, str]],
+        html: str = None,
+        files: t.List[t.Union[Attachment, t.BinaryIO]] = None,
+        headers: t.Dict[str, str] = None,
+    ) -> QueuedMessage:
+        """
+        Send a MIME email to up to `BATCH_LIMIT` recipients at once. Each recipient receives their own copy of the
+        message with any `%recipient.<name>%` variables substituted.
+        :param from_: who the email is from
+        :param to: the email recipients
+        :param subject: the email subject
+        :param text: the plaintext content
+        :param recipient_variables: a map from each recipient's email address to their variables
+        :param html: optional HTML content (if the recipient client supports it)
+        :param files: attachments to the message
+        :param headers: extra headers to be added to the message
+        :return: the queued message information
+        """
+        body, attachments = build_message(
+            from_, to, subject, text, html, files, headers, recipient_variables
+        )
+
+        # Send the request
+        response = await self.__request(
+            "POST",
+            f"{self.base_url}/{self.domain}/messages",
+            files=attachments or None,
+            data=body,
+        )
+        return parse_response(QueuedMessage, response)
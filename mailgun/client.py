@@ -1,42 +1,198 @@
+import json
+from pydantic import BaseModel
 import requests
 from requests.auth import HTTPBasicAuth
+import time
 import typing as t
+from urllib3.exceptions import NewConnectionError
 
 from .errors import *
-from .types import Domain
+from .ratelimit import RateLimiter, backoff, parse_retry_after
+from .types import Attachment, Domain, QueuedMessage
+from .usage import Usage
+
+if t.TYPE_CHECKING:
+    import httpx
 
 BASE_URL = "https://api.mailgun.net/v3"
 
+# The maximum number of recipients allowed in a single batch send
+BATCH_LIMIT = 1000
+
+# The default number of times to retry a request which failed transiently
+DEFAULT_RETRIES = 5
+
+M = t.TypeVar("M", bound=BaseModel)
+
+
+def check_status(status_code: int, retry_after: t.Optional[str] = None):
+    """
+    Raise an error if an invalid status code is encountered
+    :param status_code: the response status code
+    :param retry_after: the value of the `Retry-After` header, if any
+    """
+    if status_code == 404:
+        raise DomainNotFoundException(status_code)
+    elif status_code == 401:
+        raise UnauthorizedException(status_code)
+    elif status_code == 429:
+        raise TooManyRequestsException(status_code, parse_retry_after(retry_after))
+    elif status_code >= 500:
+        raise MailGunException(status_code, parse_retry_after(retry_after))
+    elif status_code >= 400:
+        raise MailGunException(status_code)
+
+
+def connect_failed(error: requests.ConnectionError) -> bool:
+    """
+    Check whether a request failed before any of it was sent, so retrying it cannot deliver a message twice
+    :param error: the error raised by the session
+    :return: whether a connection to the server could not be established
+    """
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def parse_response(
+    model: t.Type[M], response: t.Union[requests.Response, "httpx.Response"]
+) -> M:
+    """
+    Parse the body of a successful response, raising an error if it is malformed
+    :param model: the model to parse the body into
+    :param response: the response from either the synchronous or asynchronous client
+    :return: the parsed body
+    """
+    try:
+        return model.parse_obj(response.json())
+    except ValueError:
+        raise InvalidResponseException(response.status_code)
+
+
+def build_message(
+    from_: str,
+    to: t.List[str],
+    subject: str,
+    text: str,
+    html: str = None,
+    files: t.List[t.Union[Attachment, t.BinaryIO]] = None,
+    headers: t.Dict[str, str] = None,
+    recipient_variables: t.Dict[str, t.Dict[str, str]] = None,
+) -> t.Tuple[t.Dict[str, str], t.List[t.Tuple[str, t.Tuple[str, bytes]]]]:
+    """
+    Construct the form body and attachments for a MIME email
+    :param from_: who the email is from
+    :param to: the email recipient(s)
+    :param subject: the email subject
+    :param text: the plaintext content
+    :param html: optional HTML content (if the recipient client supports it)
+    :param files: attachments to the message
+    :param headers: extra headers to be added to the message
+    :param recipient_variables: per-recipient substitutions for batch sending
+    :return: the form body and the attachments
+    """
+    # Construct the attachments, only reading files which haven't been loaded
+    attachments = []
+    for file in files or []:
+        if isinstance(file, Attachment):
+            attachments.append(("attachment", (file.name, file.data)))
+        else:
+            attachments.append(("attachment", (file.name, file.read())))
+
+    # Construct the body
+    body = {"from": from_, "to": ",".join(to), "subject": subject, "text": text}
+    if html:
+        body["html"] = html
+
+    # Add headers to the body
+    if headers is not None:
+        for header, value in headers.items():
+            body[f"h:{header}"] = value
+
+    # Add the variables for batch sending
+    if recipient_variables is not None:
+        if len(to) > BATCH_LIMIT:
+            raise ValueError(f"at most {BATCH_LIMIT} recipients can be batched")
+        body["recipient-variables"] = json.dumps(recipient_variables)
+
+    return body, attachments
+
 
 class MailGun(object):
     """A light-weight, typed wrapper around the MailGun v3 API"""
 
-    def __init__(self, auth: t.Union[HTTPBasicAuth, str], domain: str):
+    def __init__(
+        self,
+        auth: t.Union[HTTPBasicAuth, str],
+        domain: str,
+        rate_limit: t.Optional[float] = None,
+        retries: int = DEFAULT_RETRIES,
+        base_url: str = BASE_URL,
+        session: t.Optional[requests.Session] = None,
+    ):
+        """
+        :param auth: the API key to login with
+        :param domain: the sending domain
+        :param rate_limit: the maximum number of requests per second
+        :param retries: the number of times to retry a request which failed transiently or could not connect
+        :param base_url: the URL of the API
+        :param session: the session to make requests with, such as one sharing a connection pool with other clients
+        """
         if isinstance(auth, str):
             auth = HTTPBasicAuth("api", auth)
 
         self.domain = domain
-        self.session = requests.Session()
+        self.base_url = base_url.rstrip("/")
+        self.session = session or requests.Session()
         self.session.auth = auth
 
-    @staticmethod
-    def __check_status(response: requests.Response):
+        self.limiter = RateLimiter(rate_limit)
+        self.retries = retries
+        self.usage = Usage()
+
+    def __request(self, method: str, url: str, **kwargs) -> requests.Response:
         """
-        Raise an error if an invalid status code is encountered
-        :param response: the response information
+        Make a rate limited request, retrying if it fails transiently
+        :param method: the HTTP method
+        :param url: the URL to request
+        :param kwargs: any arguments to pass to the session
+        :return: the successful response
         """
-        if response.status_code == 404:
-            raise DomainNotFoundException(response.status_code)
-        elif response.status_code == 401:
-            raise UnauthorizedException(response.status_code)
-        elif response.status_code >= 500:
-            raise MailGunException(response.status_code)
+        attempt = 0
+        while True:
+            time.sleep(self.limiter.reserve())
+
+            try:
+                response = self.session.request(method, url, **kwargs)
+                self.usage.request(response.request.headers.get("Content-Length"))
+                check_status(response.status_code, response.headers.get("Retry-After"))
+                self.limiter.recover()
+                return response
+            except TooManyRequestsException as e:
+                self.limiter.throttle(e.retry_after)
+                if attempt >= self.retries:
+                    raise
+                delay = max(backoff(attempt), e.retry_after or 0)
+            except MailGunException as e:
+                if not e.transient or attempt >= self.retries:
+                    raise
+                delay = max(backoff(attempt), e.retry_after or 0)
+            except requests.ConnectionError as e:
+                # Anything which fails after connecting may have already been delivered
+                if not connect_failed(e) or attempt >= self.retries:
+                    raise
+                delay = backoff(attempt)
+
+            attempt += 1
+            self.usage.retry()
+            time.sleep(delay)
 
     def info(self) -> Domain:
         """Get information about the current domain"""
-        response = self.session.get(f"{BASE_URL}/domains/{self.domain}")
-        self.__check_status(response)
-        return Domain.parse_obj(response.json())
+        response = self.__request("GET", f"{self.base_url}/domains/{self.domain}")
+        return parse_response(Domain, response)
 
     def send(
         self,
@@ -45,9 +201,9 @@ class MailGun(object):
         subject: str,
         text: str,
         html: str = None,
-        files: t.List[t.BinaryIO] = None,
+        files: t.List[t.Union[Attachment, t.BinaryIO]] = None,
         headers: t.Dict[str, str] = None,
-    ):
+    ) -> QueuedMessage:
         """
         Send a MIME email
         :param from_: who the email is from
@@ -57,24 +213,54 @@ class MailGun(object):
         :param html: optional HTML content (if the recipient client supports it)
         :param files: attachments to the message
         :param headers: extra headers to be added to the message
+        :return: the queued message information
         """
-        # Construct the attachments
-        attachments = []
-        if files is not None:
-            attachments = [("attachment", (file.name, file.read())) for file in files]
+        body, attachments = build_message(
+            from_, to, subject, text, html, files, headers
+        )
 
-        # Construct the body
-        body = {"from": from_, "to": ",".join(to), "subject": subject, "text": text}
-        if html:
-            body["html"] = html
+        # Send the request
+        response = self.__request(
+            "POST",
+            f"{self.base_url}/{self.domain}/messages",
+            files=attachments,
+            data=body,
+        )
+        return parse_response(QueuedMessage, response)
 
-        # Add headers to the body
-        if headers is not None:
-            for header, value in headers.items():
-                body[f"h:{header}"] = value
+    def send_batch(
+        self,
+        from_: str,
+        to: t.List[str],
+        subject: str,
+        text: str,
+        recipient_variables: t.Dict[str, t.Dict[str, str]],
+        html: str = None,
+        files: t.List[t.Union[Attachment, t.BinaryIO]] = None,
+        headers: t.Dict[str, str] = None,
+    ) -> QueuedMessage:
+        """
+        Send a MIME email to up to `BATCH_LIMIT` recipients at once. Each recipient receives their own copy of the
+        message with any `%recipient.<name>%` variables substituted.
+        :param from_: who the email is from
+        :param to: the email recipients
+        :param subject: the email subject
+        :param text: the plaintext content
+        :param recipient_variables: a map from each recipient's email address to their variables
+        :param html: optional HTML content (if the recipient client supports it)
+        :param files: attachments to the message
+        :param headers: extra headers to be added to the message
+        :return: the queued message information
+        """
+        body, attachments = build_message(
+            from_, to, subject, text, html, files, headers, recipient_variables
+        )
 
         # Send the request
-        response = self.session.post(
-            f"{BASE_URL}/{self.domain}/messages", files=attachments, data=body
+        response = self.__request(
+            "POST",
+            f"{self.base_url}/{self.domain}/messages",
+            files=attachments,
+            data=body,
         )
-        self.__check_status(response)
+        return parse_response(QueuedMessage, response)
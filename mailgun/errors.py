@@ -1,8 +1,22 @@
+import typing as t
+
+
 class MailGunException(Exception):
     """A generic MailGun exception"""
 
-    def __init__(self, status: int):
+    def __init__(self, status: int, retry_after: t.Optional[float] = None):
         self.status = status
+        self.retry_after = retry_after
+
+    def __str__(self) -> str:
+        if self.retry_after is None:
+            return str(self.status)
+        return f"{self.status} (retry after {self.retry_after:g}s)"
+
+    @property
+    def transient(self) -> bool:
+        """Whether the request could succeed if retried"""
+        return self.status >= 500
 
 
 class DomainNotFoundException(MailGunException):
@@ -11,3 +25,15 @@ class DomainNotFoundException(MailGunException):
 
 class UnauthorizedException(MailGunException):
     """The requester private key is invalid or is not allowed to access the domain"""
+
+
+class InvalidResponseException(MailGunException):
+    """The response body was not in the expected format"""
+
+
+class TooManyRequestsException(MailGunException):
+    """The rate limit for the account or domain was exceeded"""
+
+    @property
+    def transient(self) -> bool:
+        return True
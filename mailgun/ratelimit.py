@@ -0,0 +1,151 @@
+from collections import deque
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import random
+from threading import Lock
+import time
+import typing as t
+
+# The fraction of the configured rate to recover after each successful request
+RECOVERY_STEP = 0.02
+
+# The lowest fraction of the configured rate to slow down to
+MINIMUM_FRACTION = 0.05
+
+# How many seconds of requests are used to estimate the rate when none is configured, and how long after slowing down
+# further rate limit responses are put down to requests which were already in flight
+OBSERVATION_WINDOW = 1.0
+
+# The fraction of the rate which overloaded the server to learn as the highest rate when none is configured
+CEILING_MARGIN = 0.9
+
+
+def backoff(attempt: int, base: float = 0.5, cap: float = 30.0) -> float:
+    """
+    Get how long to wait before retrying using exponential backoff with full jitter
+    :param attempt: the number of attempts that have failed so far
+    :param base: the delay for the first retry in seconds
+    :param cap: the maximum delay in seconds
+    :return: the number of seconds to wait
+    """
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+def parse_retry_after(value: t.Optional[str]) -> t.Optional[float]:
+    """
+    Parse the value of a `Retry-After` header
+    :param value: the header value, either a number of seconds or an HTTP date
+    :return: the number of seconds to wait, if present and valid
+    """
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class RateLimiter(object):
+    """
+    A thread-safe token bucket limiting how quickly requests are made. The rate is reduced when the server responds
+    that it is being overloaded and slowly recovers to the configured rate as requests succeed. Without a configured
+    rate, requests are unlimited until the server pushes back. From then on, the rate which overloaded the server is
+    learned as the highest rate, and lowered again whenever the server pushes back at a rate under it.
+    """
+
+    def __init__(self, rate: t.Optional[float] = None, burst: t.Optional[int] = None):
+        """
+        :param rate: the maximum number of requests per second, unlimited if `None`
+        :param burst: the maximum number of requests that can be made at once, defaults to one second worth
+        """
+        self.limit = rate
+        self.rate = rate
+        self.ceiling = rate
+        self.burst = burst or max(1, int(rate or 1))
+
+        self._lock = Lock()
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._recent = deque()  # type: t.Deque[float]
+        self._throttled_at = float("-inf")
+
+    def _refill(self, now: float):
+        """
+        Add the tokens accumulated since the bucket was last updated. The bucket may have been pushed into the future
+        by a pause, in which case nothing accumulates until the pause is over.
+        :param now: the current time
+        """
+        if now > self._updated:
+            elapsed = now - self._updated
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def _observed_rate(self, now: float) -> float:
+        """
+        Get how many requests per second have recently been made
+        :param now: the current time
+        :return: the observed rate
+        """
+        while self._recent and self._recent[0] < now - OBSERVATION_WINDOW:
+            self._recent.popleft()
+        return max(1.0, len(self._recent) / OBSERVATION_WINDOW)
+
+    def reserve(self) -> float:
+        """
+        Reserve a slot to make a request
+        :return: the number of seconds to wait before making the request
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.rate is None:
+                self._recent.append(now)
+                return max(0.0, self._updated - now)
+
+            # Refill the bucket and take a token, going into debt if necessary
+            self._refill(now)
+            self._tokens -= 1
+
+            waiting = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            return max(0.0, self._updated - now) + waiting
+
+    def throttle(self, retry_after: t.Optional[float]):
+        """
+        Slow down after being told the rate limit was exceeded. The bucket is emptied so requests resume one at a time
+        at the reduced rate, after any pause the server asked for.
+        :param retry_after: how long the server asked to wait before retrying
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.rate is None:
+                # Start limiting below the rate which overloaded the server
+                self.ceiling = self._observed_rate(now) * CEILING_MARGIN
+                self.rate = self.ceiling / 2
+                self._recent.clear()
+                self._throttled_at = now
+            elif now - self._throttled_at >= OBSERVATION_WINDOW:
+                self._refill(now)
+                if self.limit is None:
+                    self.ceiling = max(
+                        1.0, min(self.ceiling, self.rate * CEILING_MARGIN)
+                    )
+                self.rate = max(self.ceiling * MINIMUM_FRACTION, self.rate / 2)
+                self._throttled_at = now
+
+            self._tokens = min(self._tokens, 1.0)
+            self._updated = max(self._updated, now + (retry_after or 0.0))
+
+    def recover(self):
+        """Speed back up towards the configured or learned rate after a successful request"""
+        with self._lock:
+            if self.rate is None:
+                return
+
+            self._refill(time.monotonic())
+            self.rate = min(self.ceiling, self.rate + self.ceiling * RECOVERY_STEP)
@@ -0,0 +1,338 @@
+"""
+A local stand-in for the MailGun v3 API for offline load testing. It implements enough of the API for `MailGun.info`
+and `MailGun.send` and can inject latency, rate limiting, and server errors.
+
+Run it with `python -m mailgun.server` and point `credentials.mailgun_base_url` at `http://127.0.0.1:8025/v3`.
+"""
+
+from argparse import ArgumentParser
+from base64 import b64decode
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import random
+import re
+from threading import Lock
+import time
+import typing as t
+from urllib.parse import parse_qsl
+from uuid import uuid4
+
+DOMAIN_RE = re.compile(r"^/v3/domains/([^/]+)$")
+MESSAGES_RE = re.compile(r"^/v3/([^/]+)/messages$")
+
+
+class Settings(t.NamedTuple):
+    """How the server should behave"""
+
+    api_key: t.Optional[str] = None
+    latency: float = 0.0
+    jitter: float = 0.0
+    rate_limit: t.Optional[float] = None
+    throttle_rate: float = 0.0
+    error_rate: float = 0.0
+    capture: t.Optional[str] = None
+
+
+class Stats(object):
+    """Counts of what the server has responded with"""
+
+    def __init__(self):
+        self.lock = Lock()
+        self.messages = 0
+        self.recipients = 0
+        self.bytes = 0
+        self.throttled = 0
+        self.errors = 0
+
+    def __str__(self):
+        return (
+            f"messages={self.messages} recipients={self.recipients} bytes={self.bytes} "
+            f"throttled={self.throttled} errors={self.errors}"
+        )
+
+
+class TokenBucket(object):
+    """A thread-safe token bucket which rejects requests over the rate instead of delaying them"""
+
+    def __init__(self, rate: t.Optional[float] = None):
+        """
+        :param rate: the maximum number of requests per second, unlimited if `None`
+        """
+        self.rate = rate
+        self.burst = max(1, int(rate or 1))
+
+        self.lock = Lock()
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+    def acquire(self) -> float:
+        """
+        Take a slot to handle a request if one is available right now
+        :return: zero if a slot was taken, otherwise the number of seconds until one is available
+        """
+        if self.rate is None:
+            return 0.0
+
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+
+            if self.tokens < 1:
+                return (1 - self.tokens) / self.rate
+
+            self.tokens -= 1
+            return 0.0
+
+
+class StandInServer(ThreadingHTTPServer):
+    """A threaded HTTP server holding the settings and state of the stand-in"""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address: t.Tuple[str, int], settings: Settings):
+        super().__init__(address, Handler)
+        self.settings = settings
+        self.stats = Stats()
+        self.limiter = TokenBucket(settings.rate_limit)
+
+        self.capture_lock = Lock()
+        self.capture = open(settings.capture, "a") if settings.capture else None
+
+    def server_close(self):
+        super().server_close()
+        if self.capture is not None:
+            self.capture.close()
+
+    def record(self, message: t.Dict[str, t.Any]):
+        """
+        Save a received message
+        :param message: the parsed message
+        """
+        if self.capture is None:
+            return
+
+        with self.capture_lock:
+            self.capture.write(json.dumps(message) + "\n")
+            self.capture.flush()
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Handles requests for the stand-in server"""
+
+    server: StandInServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args):
+        pass
+
+    def do_GET(self):
+        self.__read_body()
+        if not self.__preamble():
+            return
+
+        match = DOMAIN_RE.match(self.path)
+        if match is None:
+            return self.__respond(404, {"message": "not found"})
+
+        self.__respond(
+            200,
+            {
+                "domain": {
+                    "name": match.group(1),
+                    "is_disabled": False,
+                    "state": "active",
+                }
+            },
+        )
+
+    def do_POST(self):
+        body = self.__read_body()
+        if not self.__preamble():
+            return
+
+        match = MESSAGES_RE.match(self.path)
+        if match is None:
+            return self.__respond(404, {"message": "not found"})
+
+        message = parse_form(self.headers.get("Content-Type", ""), body)
+        message["domain"] = match.group(1)
+        message["id"] = f"<{uuid4()}@{match.group(1)}>"
+
+        recipients = [r for r in message.get("to", "").split(",") if r.strip()]
+        with self.server.stats.lock:
+            self.server.stats.messages += 1
+            self.server.stats.recipients += len(recipients)
+            self.server.stats.bytes += len(body)
+        self.server.record(message)
+
+        self.__respond(200, {"id": message["id"], "message": "Queued. Thank you."})
+
+    def __read_body(self) -> bytes:
+        """Read the full request body so the connection can be reused"""
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length)
+
+    def __preamble(self) -> bool:
+        """
+        Apply the latency, authentication, and fault injection common to all requests
+        :return: whether the request should continue to be handled
+        """
+        settings = self.server.settings
+
+        delay = settings.latency + random.uniform(0, settings.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        if not self.__authorized():
+            self.__respond(401, {"message": "Invalid private key"})
+            return False
+
+        # Inject rate limiting
+        waiting = self.server.limiter.acquire()
+        if waiting > 0 or random.random() < settings.throttle_rate:
+            with self.server.stats.lock:
+                self.server.stats.throttled += 1
+            self.__respond(
+                429,
+                {"message": "Too many requests"},
+                {"Retry-After": f"{max(waiting, 1.0):.0f}"},
+            )
+            return False
+
+        # Inject server errors
+        if random.random() < settings.error_rate:
+            with self.server.stats.lock:
+                self.server.stats.errors += 1
+            self.__respond(503, {"message": "Service unavailable"})
+            return False
+
+        return True
+
+    def __authorized(self) -> bool:
+        """Check the request has the expected API key"""
+        if self.server.settings.api_key is None:
+            return True
+
+        header = self.headers.get("Authorization", "")
+        if not header.startswith("Basic "):
+            return False
+
+        try:
+            username, _, password = b64decode(header[6:]).decode().partition(":")
+        except ValueError:
+            return False
+        return username == "api" and password == self.server.settings.api_key
+
+    def __respond(
+        self,
+        status: int,
+        body: t.Dict[str, t.Any],
+        headers: t.Optional[t.Dict[str, str]] = None,
+    ):
+        """
+        Send a JSON response
+        :param status: the response status code
+        :param body: the response body
+        :param headers: any extra headers
+        """
+        encoded = json.dumps(body).encode()
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(encoded)
+
+
+def parse_form(content_type: str, body: bytes) -> t.Dict[str, t.Any]:
+    """
+    Parse a URL encoded or multipart form into its fields, replacing attachments with their names and sizes
+    :param content_type: the value of the `Content-Type` header
+    :param body: the request body
+    :return: the form fields
+    """
+    if content_type.startswith("application/x-www-form-urlencoded"):
+        return dict(parse_qsl(body.decode(), keep_blank_values=True))
+
+    fields = {"attachments": []}  # type: t.Dict[str, t.Any]
+    if not content_type.startswith("multipart/form-data"):
+        return fields
+
+    document = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode() + body
+    )
+    for part in document.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        filename = part.get_filename()
+        content = part.get_payload(decode=True) or b""
+
+        if filename is not None:
+            fields["attachments"].append({"name": filename, "size": len(content)})
+        else:
+            fields[name] = content.decode()
+
+    return fields
+
+
+def main():
+    parser = ArgumentParser(
+        description="A local stand-in for the MailGun v3 API for offline load testing"
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="the address to bind to")
+    parser.add_argument("--port", type=int, default=8025, help="the port to bind to")
+    parser.add_argument("--api-key", help="the only API key to accept, if any")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds to wait per request"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="extra random seconds to wait"
+    )
+    parser.add_argument(
+        "--rate-limit", type=float, help="requests per second before responding 429"
+    )
+    parser.add_argument(
+        "--throttle-rate",
+        type=float,
+        default=0.0,
+        help="the fraction of requests to randomly respond 429 to",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="the fraction of requests to respond 503 to",
+    )
+    parser.add_argument("--capture", help="a JSON lines file to save messages to")
+    args = parser.parse_args()
+
+    settings = Settings(
+        api_key=args.api_key,
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_limit=args.rate_limit,
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+        capture=args.capture,
+    )
+    server = StandInServer((args.host, args.port), settings)
+
+    print(f"Listening on http://{args.host}:{server.server_port}/v3")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(server.stats)
+
+
+if __name__ == "__main__":
+    main()
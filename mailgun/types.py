@@ -1,4 +1,6 @@
+from pathlib import Path
 from pydantic import BaseModel
+import typing as t
 
 
 class Domain(BaseModel):
@@ -16,4 +18,30 @@ class Status(BaseModel):
     state: str
 
 
+class QueuedMessage(BaseModel):
+    """The response to a message being accepted for delivery"""
+
+    id: str
+    message: str
+
+
+class Attachment(t.NamedTuple):
+    """
+    A file attached to a message. The content is read once and can be shared between any number of messages.
+    """
+
+    name: str
+    data: bytes
+
+    @classmethod
+    def from_path(cls, path: Path) -> "Attachment":
+        """
+        Load an attachment from a file
+        :param path: the path to the file
+        :return: the attachment
+        """
+        with path.open("rb") as file:
+            return cls(path.name, file.read())
+
+
 Domain.update_forward_refs()
@@ -0,0 +1,29 @@
+from threading import Lock
+import typing as t
+
+
+class Usage(object):
+    """Thread-safe counts of the requests made by a client"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.requests = 0
+        self.retries = 0
+        self.bytes_sent = 0
+
+    def __str__(self):
+        return f"requests={self.requests} retries={self.retries} bytes_sent={self.bytes_sent}"
+
+    def request(self, content_length: t.Optional[str]):
+        """
+        Record a request that was made
+        :param content_length: the value of the request's `Content-Length` header, if any
+        """
+        with self._lock:
+            self.requests += 1
+            self.bytes_sent += int(content_length or 0)
+
+    def retry(self):
+        """Record that a request is being retried"""
+        with self._lock:
+            self.retries += 1
@@ -1 +1,14 @@
-from .config import Config
+import typing as t
+
+if t.TYPE_CHECKING:
+    from .config import Config
+
+
+def __getattr__(name: str) -> t.Any:
+    # Only load the configuration models when they are used, so the CLI starts quickly
+    if name == "Config":
+        from .config import Config
+
+        return Config
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
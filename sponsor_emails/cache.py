@@ -0,0 +1,123 @@
+import click
+import gdoc
+from google.auth.transport.requests import Request
+from google.oauth2.service_account import Credentials as ServiceAccountCredentials
+from gdoc.utils import extract_document_id
+import hashlib
+import os
+from pathlib import Path
+import pickle
+import typing as t
+
+from .config import Credentials
+
+# Where snapshots are stored by default
+CACHE_DIRECTORY = Path(click.get_app_dir("sponsor-emails")) / "cache"
+
+
+class Cache(object):
+    """
+    Snapshots of documents and sheets stored on disk. Each snapshot is keyed by the version of the source it was taken
+    from, so it is only reused while the source is unchanged.
+    """
+
+    def __init__(self, directory: Path = CACHE_DIRECTORY):
+        """
+        :param directory: where the snapshots are stored
+        """
+        self.directory = directory
+
+    def __path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return self.directory / f"{digest}.pickle"
+
+    def get(self, key: str, version: str) -> t.Optional[t.Any]:
+        """
+        Get a snapshot if it was taken from the given version
+        :param key: what the snapshot is of
+        :param version: the current version of the source
+        :return: the snapshot, if present and up to date
+        """
+        try:
+            with open(self.__path(key), "rb") as f:
+                stored_version, value = pickle.load(f)
+        except Exception:
+            # Missing and corrupt snapshots are both misses
+            return None
+
+        return value if stored_version == version else None
+
+    def put(self, key: str, version: str, value: t.Any):
+        """
+        Store a snapshot, replacing any previous one
+        :param key: what the snapshot is of
+        :param version: the version of the source the snapshot was taken from
+        :param value: the snapshot
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temporary file first so a partial snapshot is never read. Only the current user can read
+        # snapshots, since they include sponsor contact details and access tokens.
+        path = self.__path(key)
+        temporary = path.with_suffix(f".{os.getpid()}.tmp")
+        descriptor = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with open(descriptor, "wb") as f:
+            pickle.dump((version, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+
+
+def open_document(
+    client: gdoc.Client, url: str, cache: t.Optional[Cache] = None
+) -> gdoc.Document:
+    """
+    Open a document, reusing the cached copy if the document hasn't been revised since
+    :param client: the authorized Google Docs client
+    :param url: the URL to the document
+    :param cache: where to look for and store the document
+    :return: the document with its text and HTML already extracted
+    """
+    if cache is None:
+        return client.open_by_url(url)
+
+    document_id = extract_document_id(url)
+    key = f"document/{document_id}"
+
+    document = cache.get(key, client.revision(document_id))
+    if document is None:
+        document = client.open(document_id)
+
+        # Store the converted content along with the document
+        document.text
+        document.html
+        cache.put(key, document.revisionId, document)
+
+    return document
+
+
+def load_credentials(
+    credentials: Credentials, cache: t.Optional[Cache] = None
+) -> ServiceAccountCredentials:
+    """
+    Load the GCP credentials with a valid access token, reusing the token from a previous run until it expires
+    :param credentials: the credentials configuration
+    :param cache: where to look for and store the access token
+    :return: the authorized credentials
+    """
+    gcp = credentials.gcp()
+    if gcp.valid:
+        return gcp
+
+    key = f"token/{gcp.service_account_email}"
+    version = " ".join(sorted(gcp.scopes or []))
+
+    if cache is not None:
+        saved = cache.get(key, version)
+        if saved is not None:
+            gcp.token, gcp.expiry = saved
+
+    if not gcp.valid:
+        gcp.refresh(Request())
+        if cache is not None:
+            cache.put(key, version, (gcp.token, gcp.expiry))
+
+    return gcp
@@ -1,10 +1,13 @@
 import click
 from pathlib import Path
-from pydantic import ValidationError
 from sys import exit
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 
-from sponsor_emails import Config, logger, sender, tests
+from sponsor_emails import logger
+
+# Everything else is imported by the commands which use it, so `--help` and configuration errors are quick
+if TYPE_CHECKING:
+    from sponsor_emails import Config
 
 
 @click.group(
@@ -32,6 +35,9 @@ def main(ctx: click.Context, config_path: Path):
         click.echo(ctx.get_help())
 
     else:
+        from pydantic import ValidationError
+        from sponsor_emails import Config
+
         try:
             ctx.obj = Config.load(config_path)
         except ValidationError as e:
@@ -49,11 +55,21 @@ def main(ctx: click.Context, config_path: Path):
 
 
 @main.command(help="Check that the configuration is valid")
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Always download the template and sheets instead of reusing unchanged copies",
+)
 @click.pass_obj
-def validate(cfg: Config):
+def validate(cfg: "Config", no_cache: bool):
+    from sponsor_emails import tests
+    from sponsor_emails.cache import Cache
+
+    cache = None if no_cache else Cache()
+
     logger.info("Running tests..")
-    for test in tests.METHODS:
-        click.echo(test(cfg))
+    for result in tests.run(cfg, cache):
+        click.echo(result)
     logger.info("Done!")
 
 
@@ -79,23 +95,117 @@ def validate(cfg: Config):
 @click.option(
     "-c", "--count", help="The number of emails to send", default=None, type=int
 )
+@click.option(
+    "-j",
+    "--concurrency",
+    help="The maximum number of emails to send at once",
+    default=1,
+    type=click.IntRange(min=1),
+)
+@click.option(
+    "--async",
+    "use_async",
+    is_flag=True,
+    help="Send the emails using asyncio instead of threads",
+)
+@click.option(
+    "-b",
+    "--batch",
+    is_flag=True,
+    help="Send the emails in batches of up to 1000 recipients",
+)
+@click.option(
+    "--journal",
+    "journal_path",
+    type=click.Path(
+        file_okay=True,
+        dir_okay=False,
+        resolve_path=True,
+        allow_dash=False,
+        path_type=Path,
+    ),
+    help="Where to record sent messages so an interrupted run can be resumed",
+    default="./sponsor-emails.journal",
+)
+@click.option(
+    "--no-journal",
+    is_flag=True,
+    help="Don't record sent messages or skip messages recorded by previous runs",
+)
+@click.option(
+    "--flush-every",
+    "flush_rows",
+    help="The number of changed statuses to buffer before writing them to the sheet",
+    default=50,
+    type=click.IntRange(min=1),
+)
+@click.option(
+    "--flush-interval",
+    help="The maximum number of seconds to buffer changed statuses for",
+    default=30.0,
+    type=click.FloatRange(min=0),
+)
+@click.option(
+    "--metrics",
+    "metrics_path",
+    type=click.Path(
+        file_okay=True,
+        dir_okay=False,
+        resolve_path=True,
+        allow_dash=False,
+        path_type=Path,
+    ),
+    help="Where to save timings and counts for the run, as OpenMetrics text for .prom and .txt files or JSON otherwise",
+    default=None,
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Always download the template and sheets instead of reusing unchanged copies",
+)
 @click.pass_obj
 def send(
-    cfg: Config,
+    cfg: "Config",
     single: bool,
     dry_run: bool,
     overwrite: Optional[str],
     offset: int,
     count: Optional[int],
+    concurrency: int,
+    use_async: bool,
+    batch: bool,
+    journal_path: Path,
+    no_journal: bool,
+    flush_rows: int,
+    flush_interval: float,
+    metrics_path: Optional[Path],
+    no_cache: bool,
 ):
-    if dry_run:
-        Path("../dry-run-out").mkdir(exist_ok=True)
+    from sponsor_emails import sender
+    from sponsor_emails.cache import Cache
+    from sponsor_emails.metrics import Metrics
 
-    logger.info(f"Settings: single={single} dry_run={dry_run} overwrite={overwrite}")
+    logger.info(
+        f"Settings: single={single} dry_run={dry_run} overwrite={overwrite} concurrency={concurrency} async={use_async} batch={batch}"
+    )
 
+    metrics = Metrics() if metrics_path is not None else None
     try:
         success, skipped, total = sender.run(
-            cfg, single, dry_run, overwrite, offset, count
+            cfg,
+            single,
+            dry_run,
+            overwrite,
+            offset,
+            count,
+            concurrency,
+            use_async,
+            batch,
+            None if no_journal else journal_path,
+            flush_rows,
+            flush_interval,
+            metrics,
+            None if no_cache else Cache(),
         )
         click.secho("Successfully sent ", fg="green", nl=False)
         click.secho(f"{success}/{total}", fg="blue", nl=False)
@@ -105,6 +215,10 @@ def send(
     except sender.SendException as e:
         logger.error(e.message)
         exit(1)
+    finally:
+        if metrics is not None:
+            metrics.save(metrics_path)
+            logger.info(f"Saved metrics to {metrics_path}")
 
 
 if __name__ == "__main__":
@@ -1,12 +1,27 @@
-from google.oauth2.service_account import Credentials as ServiceAccountCredentials
 from pathlib import Path
-from pydantic import BaseModel, EmailStr, FilePath, HttpUrl, validator
+from pydantic import (
+    AnyHttpUrl,
+    BaseModel,
+    EmailStr,
+    Field,
+    FilePath,
+    HttpUrl,
+    NonNegativeInt,
+    PositiveFloat,
+    PositiveInt,
+    PrivateAttr,
+    validator,
+)
 import re
-from requests.auth import HTTPBasicAuth
-from typing import Optional
+from typing import Any, Dict, Optional, TYPE_CHECKING
 
 from .constants import DEFAULT_CONFIG, SCOPES
 
+# The Google and requests libraries are slow to import, so they are only imported when the credentials are used
+if TYPE_CHECKING:
+    from google.oauth2.service_account import Credentials as ServiceAccountCredentials
+    from requests.auth import HTTPBasicAuth
+
 GOOGLE_DRIVE_RE = re.compile(r"^/(document|spreadsheets)/d/[a-zA-Z0-9-_]+(/\w+)?")
 
 
@@ -41,6 +56,7 @@ class Config(BaseModel):
     senders: "Senders"
     sponsors: "Sponsors"
     template: "Template"
+    transport: "Transport" = Field(default_factory=lambda: Transport())
 
     @staticmethod
     def load(p: Path) -> "Config":
@@ -58,6 +74,11 @@ class Credentials(BaseModel):
     gcp_service_account: FilePath = "./service-account.json"
     mailgun_domain: str
     mailgun_api_key: str
+    mailgun_rate_limit: Optional[PositiveFloat] = None
+    mailgun_retries: NonNegativeInt = 5
+    mailgun_base_url: Optional[AnyHttpUrl] = None
+
+    _gcp: Optional["ServiceAccountCredentials"] = PrivateAttr(default=None)
 
     _is_present_mailgun_domain = validator("mailgun_domain", allow_reuse=True)(
         is_present
@@ -66,21 +87,43 @@ class Credentials(BaseModel):
         is_present
     )
 
-    def gcp(self) -> ServiceAccountCredentials:
+    def gcp(self) -> "ServiceAccountCredentials":
         """
-        Get authentication information for GCP
+        Get authentication information for GCP. The service account is only loaded once, so every client shares the
+        same access token.
         """
-        full_path = self.gcp_service_account.resolve()
-        return ServiceAccountCredentials.from_service_account_file(
-            str(full_path), scopes=SCOPES
-        )
-
-    def mailgun(self) -> HTTPBasicAuth:
+        if self._gcp is None:
+            from google.oauth2.service_account import (
+                Credentials as ServiceAccountCredentials,
+            )
+
+            full_path = self.gcp_service_account.resolve()
+            self._gcp = ServiceAccountCredentials.from_service_account_file(
+                str(full_path), scopes=SCOPES
+            )
+        return self._gcp
+
+    def mailgun(self) -> "HTTPBasicAuth":
         """
         Get authentication information for the MailGun API
         """
+        from requests.auth import HTTPBasicAuth
+
         return HTTPBasicAuth("api", self.mailgun_api_key)
 
+    def mailgun_options(self) -> Dict[str, Any]:
+        """
+        Get the options for connecting to the MailGun API
+        """
+        options = {
+            "rate_limit": self.mailgun_rate_limit,
+            "retries": self.mailgun_retries,
+        }
+        if self.mailgun_base_url is not None:
+            options["base_url"] = self.mailgun_base_url
+
+        return options
+
 
 class Senders(BaseModel):
     url: HttpUrl
@@ -127,6 +170,13 @@ class Template(BaseModel):
     _url_is_google_drive = validator("url", allow_reuse=True)(is_google_drive)
 
 
+class Transport(BaseModel):
+    max_connections: PositiveInt = 10
+    connect_timeout: PositiveFloat = 10.0
+    read_timeout: PositiveFloat = 60.0
+    keepalive_expiry: PositiveFloat = 30.0
+
+
 class TemplatePlaceholders(BaseModel):
     company_name: str = "{COMPANY}"
     contact_name: str = "{RECIPIENT}"
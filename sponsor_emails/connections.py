@@ -0,0 +1,99 @@
+from google.auth.transport.requests import AuthorizedSession
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+import typing as t
+
+from .config import Transport
+
+
+class TimeoutAdapter(HTTPAdapter):
+    """A pooling adapter which applies a default timeout to requests that don't set one"""
+
+    def __init__(self, timeout: t.Tuple[float, float], **kwargs):
+        """
+        :param timeout: the connect and read timeouts in seconds
+        :param kwargs: the options for the connection pool
+        """
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request: requests.PreparedRequest, timeout=None, **kwargs):
+        return super().send(request, timeout=timeout or self.timeout, **kwargs)
+
+
+class GoogleSession(AuthorizedSession):
+    """An authorized session which leaves the timeout to its adapter rather than google-auth's default"""
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        data: t.Any = None,
+        headers: t.Optional[t.Dict[str, str]] = None,
+        max_allowed_time: t.Optional[float] = None,
+        timeout: t.Any = None,
+        **kwargs,
+    ) -> requests.Response:
+        return super().request(
+            method,
+            url,
+            data=data,
+            headers=headers,
+            max_allowed_time=max_allowed_time,
+            timeout=timeout,
+            **kwargs,
+        )
+
+
+class Connections(object):
+    """
+    The HTTP connection pool shared by the Google and MailGun clients. Connections are kept alive between requests, and
+    the pool is always large enough for every request in flight to reuse a connection.
+    """
+
+    def __init__(self, cfg: Transport, concurrency: int = 1):
+        """
+        :param cfg: the transport configuration
+        :param concurrency: the number of requests which may be made at once
+        """
+        self.cfg = cfg
+        self.size = max(cfg.max_connections, concurrency)
+        self.adapter = TimeoutAdapter(
+            (cfg.connect_timeout, cfg.read_timeout), pool_maxsize=self.size
+        )
+
+    def mount(self, session: requests.Session) -> requests.Session:
+        """
+        Make a session use the shared connection pool
+        :param session: the session to change
+        :return: the same session
+        """
+        session.mount("https://", self.adapter)
+        session.mount("http://", self.adapter)
+        return session
+
+    def google(self, credentials: t.Any) -> GoogleSession:
+        """
+        Create an authorized session for the Google APIs which uses the shared connection pool
+        :param credentials: the Google credentials
+        :return: the session
+        """
+        return self.mount(GoogleSession(credentials))
+
+    def mailgun_options(self) -> t.Dict[str, t.Any]:
+        """
+        Get the options for a MailGun client to use the shared connection pool
+        """
+        return {"session": self.mount(requests.Session())}
+
+    def async_mailgun_options(self) -> t.Dict[str, t.Any]:
+        """
+        Get the options for an asyncio MailGun client. It can't share the pool, so it uses the same limits instead.
+        """
+        return {
+            "timeout": httpx.Timeout(
+                self.cfg.read_timeout, connect=self.cfg.connect_timeout
+            ),
+            "keepalive_expiry": self.cfg.keepalive_expiry,
+        }
@@ -3,7 +3,10 @@ DEFAULT_CONFIG = """{
   "credentials": {
     "gcp_service_account": "./service-account.json",
     "mailgun_domain": "",
-    "mailgun_api_key": ""
+    "mailgun_api_key": "",
+    "mailgun_rate_limit": null,
+    "mailgun_retries": 5,
+    "mailgun_base_url": null
   },
   "senders": {
     "url": "https://docs.google.com/spreadsheets/d/your-senders-sheet/edit",
@@ -33,6 +36,12 @@ DEFAULT_CONFIG = """{
       "contact_name": "{RECIPIENT}",
       "sender_name": "{SENDER}"
     }
+  },
+  "transport": {
+    "max_connections": 10,
+    "connect_timeout": 10.0,
+    "read_timeout": 60.0,
+    "keepalive_expiry": 30.0
   }
 }
 """
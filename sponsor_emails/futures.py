@@ -0,0 +1,18 @@
+from concurrent.futures import Future
+from contextlib import contextmanager
+import typing as t
+
+
+@contextmanager
+def cancel_on_error(futures: t.Iterable[Future]):
+    """
+    Cancel any futures which haven't started yet if an error is raised while waiting on them. Otherwise, shutting down
+    the executor would still run every queued task before the error is reported.
+    :param futures: the futures being waited on
+    """
+    try:
+        yield
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        raise
@@ -0,0 +1,107 @@
+from pathlib import Path
+import sqlite3
+from threading import Lock
+import time
+import typing as t
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outcomes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sheet TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    company TEXT NOT NULL,
+    contact_email TEXT NOT NULL,
+    sent INTEGER NOT NULL,
+    message_id TEXT,
+    recorded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outcomes_recipient ON outcomes (sheet, company, contact_email);
+"""
+
+
+class Entry(t.NamedTuple):
+    """The most recent outcome of sending to a recipient"""
+
+    row: int
+    sent: bool
+    message_id: t.Optional[str]
+
+
+class Journal(object):
+    """
+    An append-only record of the outcome of each message which is persisted as soon as it is known. This allows an
+    interrupted run to be resumed without resending any messages. Outcomes can be recorded from any thread.
+    """
+
+    def __init__(self, path: Path, sheet: str):
+        """
+        :param path: where the journal is stored
+        :param sheet: an identifier for the sponsors sheet being sent from
+        """
+        self.sheet = sheet
+
+        self._lock = Lock()
+        self.connection = sqlite3.connect(
+            str(path), isolation_level=None, check_same_thread=False
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=FULL")
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        """Close the journal"""
+        self.connection.close()
+
+    def record(
+        self,
+        row: int,
+        company: str,
+        contact_email: str,
+        sent: bool,
+        message_id: t.Optional[str] = None,
+    ):
+        """
+        Record the outcome of sending a message
+        :param row: the row of the sheet the message was sent for
+        :param company: the company the message was sent to
+        :param contact_email: the email the message was sent to
+        :param sent: whether the message was sent successfully
+        :param message_id: the MailGun id of the message
+        """
+        with self._lock:
+            self.connection.execute(
+                "INSERT INTO outcomes (sheet, row, company, contact_email, sent, message_id, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.sheet,
+                    row,
+                    company,
+                    contact_email,
+                    sent,
+                    message_id,
+                    time.time(),
+                ),
+            )
+
+    def replay(self) -> t.Dict[t.Tuple[str, str], Entry]:
+        """
+        Get the most recent outcome for each recipient of the sheet
+        :return: a map from company and contact email to the latest outcome
+        """
+        cursor = self.connection.execute(
+            "SELECT company, contact_email, row, sent, message_id FROM outcomes "
+            "WHERE sheet = ? ORDER BY id",
+            (self.sheet,),
+        )
+
+        entries = {}
+        for company, contact_email, row, sent, message_id in cursor:
+            entries[(company, contact_email)] = Entry(row, bool(sent), message_id)
+
+        return entries
@@ -0,0 +1,204 @@
+from contextlib import contextmanager
+import json
+from pathlib import Path
+from threading import Lock
+import time
+import typing as t
+
+# The upper bounds of the latency histogram buckets in seconds
+LATENCY_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+# The counts kept for each run
+COUNTERS = ("sent", "already_sent", "retried", "failed", "bytes_uploaded")
+
+# The file extensions which are written in the OpenMetrics text format rather than JSON
+OPENMETRICS_SUFFIXES = (".prom", ".txt")
+
+PREFIX = "sponsor_emails"
+
+
+class Histogram(object):
+    """A thread-safe histogram of durations"""
+
+    def __init__(self, buckets: t.Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None  # type: t.Optional[float]
+        self.max = None  # type: t.Optional[float]
+
+        self._lock = Lock()
+
+    def observe(self, value: float):
+        """
+        Add a value to the histogram
+        :param value: the duration in seconds
+        """
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+            self.min = value if self.min is None else min(self.min, value)
+            self.max = value if self.max is None else max(self.max, value)
+
+    def cumulative(self) -> t.List[t.Tuple[str, int]]:
+        """
+        Get the cumulative count for each bucket
+        :return: pairs of the bucket upper bound and the number of values less than or equal to it
+        """
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append(("+Inf" if bound == float("inf") else str(bound), total))
+        return result
+
+    def quantile(self, q: float) -> t.Optional[float]:
+        """
+        Estimate a quantile using the upper bound of the bucket it falls in
+        :param q: the quantile between 0 and 1
+        :return: the estimated value, if anything has been observed
+        """
+        if self.count == 0:
+            return None
+
+        rank = q * self.count
+        for (_, total), bound in zip(self.cumulative(), self.buckets):
+            if total >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def dict(self) -> t.Dict[str, t.Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "buckets": dict(self.cumulative()),
+        }
+
+
+class Metrics(object):
+    """Timings and counts collected while sending"""
+
+    def __init__(self):
+        self.phases = {}  # type: t.Dict[str, float]
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.latencies = {
+            "render": Histogram(),
+            "send": Histogram(),
+        }
+
+        self._lock = Lock()
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Time a phase of the run. Phases entered multiple times have their durations added together.
+        :param name: the name of the phase
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    @contextmanager
+    def time(self, name: str):
+        """
+        Record how long an operation on a single message took
+        :param name: the latency histogram to add to
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.latencies[name].observe(time.perf_counter() - start)
+
+    def count(self, name: str, amount: int = 1):
+        """
+        Increment a counter
+        :param name: the counter to increment
+        :param amount: how much to increment it by
+        """
+        with self._lock:
+            self.counters[name] += amount
+
+    def dict(self) -> t.Dict[str, t.Any]:
+        return {
+            "phases": dict(self.phases),
+            "counters": dict(self.counters),
+            "latencies": {
+                name: histogram.dict() for name, histogram in self.latencies.items()
+            },
+        }
+
+    def openmetrics(self) -> str:
+        """
+        Format the metrics using the OpenMetrics text format
+        :return: the formatted metrics
+        """
+        lines = [
+            f"# HELP {PREFIX}_phase_seconds Wall-clock time spent in each phase of the run.",
+            f"# TYPE {PREFIX}_phase_seconds gauge",
+        ]
+        for name, seconds in self.phases.items():
+            lines.append(f'{PREFIX}_phase_seconds{{phase="{name}"}} {seconds}')
+
+        for name, value in self.counters.items():
+            lines.append(f"# TYPE {PREFIX}_{name} counter")
+            lines.append(f"{PREFIX}_{name}_total {value}")
+
+        lines.append(
+            f"# HELP {PREFIX}_latency_seconds Time taken to render and send each message."
+        )
+        lines.append(f"# TYPE {PREFIX}_latency_seconds histogram")
+        for name, histogram in self.latencies.items():
+            for bound, total in histogram.cumulative():
+                lines.append(
+                    f'{PREFIX}_latency_seconds_bucket{{operation="{name}",le="{bound}"}} {total}'
+                )
+            lines.append(
+                f'{PREFIX}_latency_seconds_count{{operation="{name}"}} {histogram.count}'
+            )
+            lines.append(
+                f'{PREFIX}_latency_seconds_sum{{operation="{name}"}} {histogram.sum}'
+            )
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def save(self, path: Path):
+        """
+        Write the metrics to a file, using the OpenMetrics text format for `.prom` and `.txt` files and JSON otherwise
+        :param path: where to write the metrics
+        """
+        if path.suffix in OPENMETRICS_SUFFIXES:
+            path.write_text(self.openmetrics())
+        else:
+            path.write_text(json.dumps(self.dict(), indent=2))
@@ -1,2 +1,3 @@
-from .errors import SendException
+from .errors import SendException, TemplateException
 from .run import run
+from .template import Template
@@ -0,0 +1,77 @@
+import csv
+import json
+from pathlib import Path
+from threading import Lock
+import typing as t
+
+# The size of the buffer for the archive
+BUFFER_SIZE = 1024 * 1024
+
+
+class DryRunWriter(object):
+    """
+    Writes the messages of a dry run to a single JSON lines archive. An index of the recipients and where their
+    message starts in the archive is written alongside it. Messages can be written from multiple threads at once.
+    """
+
+    def __init__(self, directory: Path):
+        """
+        :param directory: where to write the archive and index
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+
+        self.archive = (directory / "messages.jsonl").open("wb", buffering=BUFFER_SIZE)
+        self.index_file = (directory / "index.csv").open("w", newline="")
+        self.index = csv.writer(self.index_file)
+        self.index.writerow(["number", "offset", "from", "to"])
+
+        self.lock = Lock()
+        self.count = 0
+        self.offset = 0
+
+    def __enter__(self) -> "DryRunWriter":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        """Flush and close the archive and index"""
+        self.archive.close()
+        self.index_file.close()
+
+    def write(
+        self,
+        from_: str,
+        to: t.List[str],
+        subject: str,
+        reply_to: str,
+        text: str,
+        html: str,
+    ):
+        """
+        Add a message to the archive
+        :param from_: who the email is from
+        :param to: the email recipient(s)
+        :param subject: the email subject
+        :param reply_to: the email which replies are directed to
+        :param text: the plaintext content
+        :param html: the HTML content
+        """
+        line = json.dumps(
+            {
+                "from": from_,
+                "to": to,
+                "subject": subject,
+                "reply_to": reply_to,
+                "text": text,
+                "html": html,
+            }
+        )
+        encoded = line.encode("utf-8") + b"\n"
+
+        with self.lock:
+            self.count += 1
+            self.index.writerow([self.count, self.offset, from_, ", ".join(to)])
+            self.archive.write(encoded)
+            self.offset += len(encoded)
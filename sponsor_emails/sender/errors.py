@@ -11,3 +11,7 @@ class CredentialsException(SendException):
 
 class NotFoundException(SendException):
     """Failed to find a document or sheet"""
+
+
+class TemplateException(SendException):
+    """The message template is invalid"""
@@ -1,37 +1,77 @@
+import asyncio
 import click
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from email.utils import getaddresses
+from functools import partial
 import gdoc
+from google.auth.exceptions import RefreshError
 from googleapiclient.errors import HttpError
 import gspread
+import httpx
 from json import JSONDecodeError
 import mailgun
 from pathlib import Path
 import random
+import requests
+from threading import Lock
 import typing as t
-from uuid import uuid4
 
+from .dryrun import DryRunWriter
 from .errors import CredentialsException, NotFoundException, SendException
 from .. import logger, sheets
+from ..cache import Cache, load_credentials, open_document
 from ..config import Config, TemplatePlaceholders
+from ..connections import Connections
+from ..futures import cancel_on_error
+from .template import Template
+from ..journal import Journal
+from ..metrics import Metrics
 
+SUBJECT = "WaffleHacks Sponsorship Opportunity"
 
-def format_template(
-    placeholders: TemplatePlaceholders, values: TemplatePlaceholders, template: str
-) -> str:
+# Where the messages are written to on dry runs
+DRY_RUN_DIRECTORY = Path("./dry-run-out")
+
+
+class Message(t.NamedTuple):
+    """A message waiting to be sent"""
+
+    row: int
+    status: str
+    values: TemplatePlaceholders
+    contact_email: str
+
+
+# Whether a message was sent and its MailGun id, if it has one
+Outcome = t.Tuple[bool, t.Optional[str]]
+
+
+def format_addresses(
+    domain: str, sender: str, contact_name: str, contact_email: str
+) -> t.Optional[t.Tuple[str, t.List[str]]]:
     """
-    Replace the values within a template
-    :param placeholders: the placeholder names
-    :param values: the values for each placeholder
-    :param template: the template to format
-    :return: a formatted template
+    Format the sender and recipient addresses for a message
+    :param domain: the sending domain
+    :param sender: the name of the person sending the email
+    :param contact_name: the name of the contact at the company
+    :param contact_email: the email of the contact at the company
+    :return: the sender address and recipient addresses, if all are valid
     """
-    for key in placeholders.__fields__.keys():
-        placeholder = getattr(placeholders, key)
-        value = getattr(values, key)
+    # Format the sender email
+    sender_email = (
+        f"{sender[0]}{sender[sender.index(' ') + 1:].replace('-', '')}@{domain}".lower()
+    )
 
-        template = template.replace(placeholder, value)
+    # Get and format the contact email(s)
+    pairs = getaddresses([contact_email.replace(" ", "")])
+    emails = []
+    for _, email in pairs:
+        if email == "":
+            logger.error(f'invalid email address found in "{contact_email}"')
+            return None
+        emails.append(f"{contact_name} <{email.lower()}>")
 
-    return template
+    return f"{sender} <{sender_email}>", emails
 
 
 def send_message(
@@ -41,9 +81,9 @@ def send_message(
     contact_email: str,
     sender: str,
     reply_to: str,
-    sponsorship_package: t.Optional[Path],
-    dry_run: bool,
-) -> bool:
+    sponsorship_package: t.Optional[mailgun.Attachment],
+    dry_run: t.Optional[DryRunWriter],
+) -> Outcome:
     """
     Send an individual email and report if it was successful
     :param mg: the MailGun instance
@@ -52,56 +92,468 @@ def send_message(
     :param contact_email: the email of the contact at the company
     :param sender: the name of the person sending the email
     :param reply_to: the email which replies are directed to
-    :param sponsorship_package: an optional file for the sponsorship package
-    :param dry_run: whether to actually send the email
-    :return: whether the sending was successful
+    :param sponsorship_package: the optional sponsorship package to attach
+    :param dry_run: where to write the message instead of sending it, if anywhere
+    :return: whether the sending was successful and the MailGun message id
     """
     text, html = templates
 
-    # Format the sender email
-    sender_email = f"{sender[0]}{sender[sender.index(' ') + 1:].replace('-', '')}@{mg.domain}".lower()
+    addresses = format_addresses(mg.domain, sender, contact_name, contact_email)
+    if addresses is None:
+        return False, None
+    from_, emails = addresses
 
-    # Get and format the contact email(s)
-    pairs = getaddresses([contact_email.replace(" ", "")])
-    emails = []
-    for _, email in pairs:
-        if email == "":
-            logger.error(f'invalid email address found in "{contact_email}"')
-            return False
-        emails.append(f"{contact_name} <{email.lower()}>")
+    # Write out the content on dry runs
+    if dry_run is not None:
+        dry_run.write(from_, emails, SUBJECT, reply_to, text, html)
+        return True, None
 
-    # Print out the content on dry runs
-    if dry_run:
-        click.echo(
-            f"To: {', '.join(emails)}\n"
-            f"From: {sender} <{sender_email}>\n"
-            f"Subject: WaffleHacks Sponsorship Opportunity\n"
-            f"Reply To: {reply_to}\n\n\n"
-            f"{text}",
-            file=open(f"./dry-run-out/{contact_name} - {uuid4()}", "w"),
+    try:
+        queued = mg.send(
+            from_=from_,
+            to=emails,
+            subject=SUBJECT,
+            text=text,
+            html=html,
+            files=[sponsorship_package] if sponsorship_package else None,
+            headers={"Reply-To": reply_to},
         )
-        return True
+    except (mailgun.MailGunException, requests.RequestException) as e:
+        logger.error(f"failed to send message: {e}")
+        return False, None
+
+    return True, queued.id
 
-    try:
-        # Open the package if necessary
-        files = []
-        if sponsorship_package:
-            files.append(sponsorship_package.open("rb"))
 
-        mg.send(
-            from_=f"{sender} <{sender_email}>",
+async def send_message_async(
+    mg: mailgun.AsyncMailGun,
+    templates: t.Tuple[str, str],
+    contact_name: str,
+    contact_email: str,
+    sender: str,
+    reply_to: str,
+    sponsorship_package: t.Optional[mailgun.Attachment],
+    dry_run: t.Optional[DryRunWriter],
+) -> Outcome:
+    """
+    Send an individual email using asyncio and report if it was successful
+    :param mg: the asynchronous MailGun instance
+    :param templates: the text and html templates respectively
+    :param contact_name: the name of the contact at the company
+    :param contact_email: the email of the contact at the company
+    :param sender: the name of the person sending the email
+    :param reply_to: the email which replies are directed to
+    :param sponsorship_package: the optional sponsorship package to attach
+    :param dry_run: where to write the message instead of sending it, if anywhere
+    :return: whether the sending was successful and the MailGun message id
+    """
+    text, html = templates
+
+    addresses = format_addresses(mg.domain, sender, contact_name, contact_email)
+    if addresses is None:
+        return False, None
+    from_, emails = addresses
+
+    # Write out the content on dry runs
+    if dry_run is not None:
+        dry_run.write(from_, emails, SUBJECT, reply_to, text, html)
+        return True, None
+
+    try:
+        queued = await mg.send(
+            from_=from_,
             to=emails,
-            subject="WaffleHacks Sponsorship Opportunity",
+            subject=SUBJECT,
             text=text,
             html=html,
-            files=files,
+            files=[sponsorship_package] if sponsorship_package else None,
             headers={"Reply-To": reply_to},
         )
-    except mailgun.MailGunException as e:
+    except (mailgun.MailGunException, httpx.HTTPError) as e:
         logger.error(f"failed to send message: {e}")
-        return False
+        return False, None
+
+    return True, queued.id
+
+
+def record_usage(usage: mailgun.Usage, metrics: Metrics):
+    """
+    Add the requests made by a MailGun client to the metrics
+    :param usage: the client's usage
+    :param metrics: where to record the counts
+    """
+    metrics.count("retried", usage.retries)
+    metrics.count("bytes_uploaded", usage.bytes_sent)
+
+
+def render_message(
+    message: Message, templates: t.Tuple[Template, Template]
+) -> t.Tuple[str, str]:
+    """
+    Fill in the placeholders of the message templates
+    :param message: the message to render
+    :param templates: the compiled text and html templates respectively
+    :return: the rendered text and html respectively
+    """
+    text, html = templates
+    return text.render(message.values), html.render(message.values)
+
+
+def send_threaded(
+    cfg: Config,
+    messages: t.List[Message],
+    templates: t.Tuple[Template, Template],
+    package: t.Optional[mailgun.Attachment],
+    dry_run: t.Optional[DryRunWriter],
+    concurrency: int,
+    on_result: t.Callable[[Message, bool, t.Optional[str]], None],
+    metrics: Metrics,
+    connections: Connections,
+):
+    """
+    Send the messages using a pool of threads
+    :param cfg: the configuration
+    :param messages: the messages to send
+    :param templates: the compiled text and html templates respectively
+    :param package: the optional sponsorship package to attach
+    :param dry_run: where to write the messages instead of sending them, if anywhere
+    :param concurrency: the maximum number of messages to send at once
+    :param on_result: called from the workers with whether each message was sent and its id as they finish
+    :param metrics: where to record timings and counts
+    :param connections: the shared HTTP connection pool
+    """
+    mg = mailgun.authorize(
+        cfg.credentials.mailgun(),
+        cfg.credentials.mailgun_domain,
+        **cfg.credentials.mailgun_options(),
+        **connections.mailgun_options(),
+    )
+
+    def deliver(message: Message):
+        with metrics.time("render"):
+            rendered = render_message(message, templates)
+
+        with metrics.time("send"):
+            sent, message_id = send_message(
+                mg,
+                rendered,
+                message.values.contact_name,
+                message.contact_email,
+                message.values.sender_name,
+                cfg.senders.reply_to,
+                package,
+                dry_run,
+            )
+        on_result(message, sent, message_id)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(deliver, message) for message in messages]
+        with cancel_on_error(futures):
+            for future in as_completed(futures):
+                future.result()
+
+    record_usage(mg.usage, metrics)
+
+
+async def send_async(
+    cfg: Config,
+    messages: t.List[Message],
+    templates: t.Tuple[Template, Template],
+    package: t.Optional[mailgun.Attachment],
+    dry_run: t.Optional[DryRunWriter],
+    concurrency: int,
+    on_result: t.Callable[[Message, bool, t.Optional[str]], None],
+    metrics: Metrics,
+    connections: Connections,
+):
+    """
+    Send the messages using a single asyncio event loop
+    :param cfg: the configuration
+    :param messages: the messages to send
+    :param templates: the compiled text and html templates respectively
+    :param package: the optional sponsorship package to attach
+    :param dry_run: where to write the messages instead of sending them, if anywhere
+    :param concurrency: the maximum number of messages to send at once
+    :param on_result: called from a worker thread with whether each message was sent and its id as they finish
+    :param metrics: where to record timings and counts
+    :param connections: the shared HTTP connection pool
+    """
+    limit = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+
+    async with mailgun.authorize_async(
+        cfg.credentials.mailgun(),
+        cfg.credentials.mailgun_domain,
+        concurrency,
+        **cfg.credentials.mailgun_options(),
+        **connections.async_mailgun_options(),
+    ) as mg:
+
+        async def deliver(message: Message):
+            async with limit:
+                with metrics.time("render"):
+                    rendered = render_message(message, templates)
+
+                with metrics.time("send"):
+                    sent, message_id = await send_message_async(
+                        mg,
+                        rendered,
+                        message.values.contact_name,
+                        message.contact_email,
+                        message.values.sender_name,
+                        cfg.senders.reply_to,
+                        package,
+                        dry_run,
+                    )
+
+            # Recording the outcome blocks on the journal and sheet, so keep it off the event loop
+            await loop.run_in_executor(None, on_result, message, sent, message_id)
+
+        await asyncio.gather(*(deliver(message) for message in messages))
+
+    record_usage(mg.usage, metrics)
+
+
+def batch_placeholders() -> TemplatePlaceholders:
+    """
+    Get the MailGun recipient variables to substitute for each placeholder when batch sending
+    :return: a recipient variable reference for each placeholder
+    """
+    return TemplatePlaceholders(
+        **{key: f"%recipient.{key}%" for key in TemplatePlaceholders.__fields__.keys()}
+    )
+
+
+class Batch(t.NamedTuple):
+    """A group of messages from the same sender to be sent at once"""
+
+    from_: str
+    messages: t.List[Message]
+    to: t.List[str]
+    recipient_variables: t.Dict[str, t.Dict[str, str]]
+    # The formatted recipient addresses of each message
+    addresses: t.List[t.List[str]]
+
 
-    return True
+def group_batches(
+    domain: str,
+    messages: t.List[Message],
+    on_result: t.Callable[[Message, bool, t.Optional[str]], None],
+) -> t.List[Batch]:
+    """
+    Group the messages into batches by sender. Each batch has at most `mailgun.BATCH_LIMIT` recipients and each
+    recipient only appears once within a batch.
+    :param domain: the sending domain
+    :param messages: the messages to group
+    :param on_result: called for any messages which have invalid addresses
+    :return: the batches to send
+    """
+    batches = []
+    open_batches = {}  # type: t.Dict[str, Batch]
+    for message in messages:
+        addresses = format_addresses(
+            domain,
+            message.values.sender_name,
+            message.values.contact_name,
+            message.contact_email,
+        )
+        if addresses is None:
+            on_result(message, False, None)
+            continue
+        from_, emails = addresses
+
+        # Start a new batch if this one is full or already has one of the recipients
+        batch = open_batches.get(from_)
+        recipients = [email for _, email in getaddresses(emails)]
+        if (
+            batch is None
+            or len(batch.to) + len(recipients) > mailgun.BATCH_LIMIT
+            or any(recipient in batch.recipient_variables for recipient in recipients)
+        ):
+            batch = Batch(from_, [], [], {}, [])
+            open_batches[from_] = batch
+            batches.append(batch)
+
+        # Add the recipients with their values
+        batch.messages.append(message)
+        batch.addresses.append(emails)
+        batch.to.extend(emails)
+        for recipient in recipients:
+            batch.recipient_variables[recipient] = message.values.dict()
+
+    return batches
+
+
+def send_batched(
+    cfg: Config,
+    messages: t.List[Message],
+    templates: t.Tuple[Template, Template],
+    package: t.Optional[mailgun.Attachment],
+    dry_run: t.Optional[DryRunWriter],
+    concurrency: int,
+    on_result: t.Callable[[Message, bool, t.Optional[str]], None],
+    metrics: Metrics,
+    connections: Connections,
+):
+    """
+    Send the messages in batches, letting MailGun fill in the placeholders for each recipient. Rows with multiple
+    contact emails will have a separate copy sent to each address.
+    :param cfg: the configuration
+    :param messages: the messages to send
+    :param templates: the compiled text and html templates respectively
+    :param package: the optional sponsorship package to attach
+    :param dry_run: where to write the messages instead of sending them, if anywhere
+    :param concurrency: the maximum number of batches to send at once
+    :param on_result: called from the workers with whether each message was sent and its id as they finish
+    :param metrics: where to record timings and counts
+    :param connections: the shared HTTP connection pool
+    """
+    mg = mailgun.authorize(
+        cfg.credentials.mailgun(),
+        cfg.credentials.mailgun_domain,
+        **cfg.credentials.mailgun_options(),
+        **connections.mailgun_options(),
+    )
+
+    # Fill the placeholders with recipient variables
+    variables = batch_placeholders()
+    with metrics.time("render"):
+        text = templates[0].render(variables)
+        html = templates[1].render(variables)
+
+    @metrics.time("send")
+    def send(batch: Batch) -> Outcome:
+        # Write out the content on dry runs
+        if dry_run is not None:
+            for message, emails in zip(batch.messages, batch.addresses):
+                dry_run.write(
+                    batch.from_,
+                    emails,
+                    SUBJECT,
+                    cfg.senders.reply_to,
+                    *render_message(message, templates),
+                )
+            return True, None
+
+        try:
+            queued = mg.send_batch(
+                from_=batch.from_,
+                to=batch.to,
+                subject=SUBJECT,
+                text=text,
+                recipient_variables=batch.recipient_variables,
+                html=html,
+                files=[package] if package else None,
+                headers={"Reply-To": cfg.senders.reply_to},
+            )
+        except (mailgun.MailGunException, requests.RequestException) as e:
+            logger.error(f"failed to send batch: {e}")
+            return False, None
+
+        return True, queued.id
+
+    def deliver(batch: Batch):
+        sent, message_id = send(batch)
+        for message in batch.messages:
+            on_result(message, sent, message_id)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [
+            executor.submit(deliver, batch)
+            for batch in group_batches(mg.domain, messages, on_result)
+        ]
+        with cancel_on_error(futures):
+            for future in as_completed(futures):
+                future.result()
+
+    record_usage(mg.usage, metrics)
+
+
+def open_template(
+    cfg: Config,
+    credentials: t.Any,
+    session: requests.Session,
+    cache: t.Optional[Cache],
+    metrics: Metrics,
+) -> t.Tuple[Template, Template]:
+    """
+    Connect to Google Docs then open and compile the message template
+    :param cfg: the configuration
+    :param credentials: the Google credentials
+    :param session: the authorized session to make requests with
+    :param cache: where to reuse an unchanged copy of the template from
+    :param metrics: where to record timings
+    :return: the plaintext and HTML templates
+    """
+    logger.info("Connecting to Google Docs...")
+    try:
+        with metrics.phase("connect_docs"):
+            gd = gdoc.authorize(credentials, session=session)
+    except (JSONDecodeError, KeyError, ValueError) as e:
+        raise CredentialsException(f"unable to load credentials: {e}")
+
+    logger.info("Opening message template...")
+    with metrics.phase("open_template"):
+        template = open_document(gd, cfg.template.url, cache)
+    with metrics.phase("compile_template"):
+        return Template.from_document(template, cfg.template.placeholders)
+
+
+def open_sheets(
+    cfg: Config,
+    credentials: t.Any,
+    session: requests.Session,
+    first_row: int,
+    last_row: t.Optional[int],
+    cache: t.Optional[Cache],
+    metrics: Metrics,
+) -> t.List[sheets.SheetData]:
+    """
+    Connect to Google Sheets then load the senders and the sponsors to send to
+    :param cfg: the configuration
+    :param credentials: the Google credentials
+    :param session: the authorized session to make requests with
+    :param first_row: the first sponsor row to load
+    :param last_row: the last sponsor row to load, or `None` for every remaining row
+    :param cache: where to reuse unchanged copies of the sheets from
+    :param metrics: where to record timings
+    :return: the senders and sponsors sheet data respectively
+    """
+    logger.info("Connecting to Google Sheets...")
+    try:
+        with metrics.phase("connect_sheets"):
+            gs = gspread.authorize(
+                credentials, client_class=partial(gspread.Client, session=session)
+            )
+    except (JSONDecodeError, KeyError, ValueError) as e:
+        raise CredentialsException(f"unable to load credentials: {e}")
+
+    logger.info("Fetching senders and sponsors lists...")
+    with metrics.phase("load_sheets"):
+        return sheets.load_sheets(
+            gs,
+            [
+                sheets.SheetRange(cfg.senders.url, cfg.senders.sheet),
+                sheets.SheetRange(
+                    cfg.sponsors.url, cfg.sponsors.sheet, first_row, last_row
+                ),
+            ],
+            cache,
+        )
+
+
+def load_package(cfg: Config, metrics: Metrics) -> t.Optional[mailgun.Attachment]:
+    """
+    Load the sponsorship package once for every message
+    :param cfg: the configuration
+    :param metrics: where to record timings
+    :return: the package, if one is configured
+    """
+    if not cfg.sponsors.package:
+        return None
+
+    with metrics.phase("load_package"):
+        return mailgun.Attachment.from_path(cfg.sponsors.package)
 
 
 def run(
@@ -111,6 +563,14 @@ def run(
     overwrite: t.Optional[str],
     offset: int,
     count: t.Optional[int],
+    concurrency: int = 1,
+    use_async: bool = False,
+    batch: bool = False,
+    journal_path: t.Optional[Path] = None,
+    flush_rows: int = 50,
+    flush_interval: float = 30.0,
+    metrics: t.Optional[Metrics] = None,
+    cache: t.Optional[Cache] = None,
 ) -> t.Tuple[int, int, int]:
     """
     Send all the sponsor emails
@@ -120,76 +580,94 @@ def run(
     :param overwrite: replace the recipient email
     :param offset: the number of emails to skip
     :param count: the number of emails to send
+    :param concurrency: the maximum number of messages to send at once
+    :param use_async: send using asyncio rather than a pool of threads
+    :param batch: send using MailGun batch sending rather than one request per message
+    :param journal_path: where to record the outcome of each message so interrupted runs can be resumed
+    :param flush_rows: the number of changed statuses to buffer before writing them to the sheet
+    :param flush_interval: the maximum number of seconds to buffer changed statuses for
+    :param metrics: where to record timings and counts for the run
+    :param cache: where to reuse unchanged copies of the template and sheets from
     :return: the number of successful emails, number of skipped emails, and total emails sent
     """
-    # Connect to the services
-    logger.info("Connecting to Google Drive and Mailgun...")
+    if metrics is None:
+        metrics = Metrics()
+
+    # Get an access token once for both clients
     try:
-        gd = gdoc.authorize(cfg.credentials.gcp())
-        gs = gspread.authorize(cfg.credentials.gcp())
-        mg = mailgun.authorize(
-            cfg.credentials.mailgun(), cfg.credentials.mailgun_domain
-        )
+        with metrics.phase("connect"):
+            credentials = load_credentials(cfg.credentials, cache)
     except (JSONDecodeError, KeyError, ValueError) as e:
         raise CredentialsException(f"unable to load credentials: {e}")
-
-    # Open the documents
-    try:
-        logger.info("Opening message template...")
-        template = gd.open_by_url(cfg.template.url)
-        template_text = template.text
-        template_html = template.html
-
-        logger.info("Opening senders list...")
-        senders = gs.open_by_url(cfg.senders.url).worksheet(cfg.senders.sheet)
-        logger.info("Opening sponsors list...")
-        sponsors = gs.open_by_url(cfg.sponsors.url).worksheet(cfg.sponsors.sheet)
-    except gspread.exceptions.APIError as e:
-        if e.response.status_code == 404:
-            raise NotFoundException("could not find sheet")
-
-        error = e.response.json()
-        raise SendException(error.get("message"))
-    except gspread.exceptions.WorksheetNotFound as e:
-        raise NotFoundException(f'could not find worksheet "{e.args[0]}"')
-    except HttpError as e:
-        if e.status_code == 404:
-            raise NotFoundException("could not find template")
-        else:
-            raise SendException(
-                f"unable to get document: ({e.status_code}) {e._get_reason()}"
-            )
-    except (gdoc.NoValidIdFound, gspread.exceptions.NoValidUrlKeyFound):
-        raise SendException("invalid document url")
+    except RefreshError as e:
+        raise CredentialsException(f"unable to authenticate: {e}")
+
+    # Share one pool of connections between every client
+    connections = Connections(cfg.transport, concurrency)
+    session = connections.google(credentials)
+
+    # Only fetch the rows which will be sent
+    if single:
+        count = 1
+    first_row = offset + 2
+    last_row = None if count is None else offset + count + 1
+
+    # Open the documents and load the sponsorship package at the same time
+    logger.info("Opening message template and fetching senders and sponsors lists...")
+    with metrics.phase("startup"), ThreadPoolExecutor(max_workers=3) as executor:
+        templates_future = executor.submit(
+            open_template, cfg, credentials, session, cache, metrics
+        )
+        sheets_future = executor.submit(
+            open_sheets, cfg, credentials, session, first_row, last_row, cache, metrics
+        )
+        package_future = executor.submit(load_package, cfg, metrics)
+
+        # Wait for each in the order they used to run, so the same error is reported when several fail
+        try:
+            templates = templates_future.result()
+            senders, sponsors = sheets_future.result()
+        except gspread.exceptions.APIError as e:
+            if e.response.status_code == 404:
+                raise NotFoundException("could not find sheet")
+
+            error = e.response.json()
+            raise SendException(error.get("message"))
+        except gspread.exceptions.WorksheetNotFound as e:
+            raise NotFoundException(f'could not find worksheet "{e.args[0]}"')
+        except HttpError as e:
+            if e.status_code == 404:
+                raise NotFoundException("could not find template")
+            else:
+                raise SendException(
+                    f"unable to get document: ({e.status_code}) {e._get_reason()}"
+                )
+        except (gdoc.NoValidIdFound, gspread.exceptions.NoValidUrlKeyFound):
+            raise SendException("invalid document url")
+
+        try:
+            package = package_future.result()
+        except OSError as e:
+            raise NotFoundException(f"could not read sponsorship package: {e}")
 
     # Get the columns
     try:
-        sponsors_columns = sheets.map_columns_to_headers(sponsors, cfg.sponsors.headers)
+        sponsors_columns = sheets.map_headers(sponsors.headers, cfg.sponsors.headers)
         senders_column = sheets.index_to_label(
-            senders.row_values(1).index(cfg.senders.header)
+            senders.headers.index(cfg.senders.header)
         )
     except (ValueError, sheets.MissingHeaderException):
         raise NotFoundException("could not find column header")
 
-    # Fetch the data
-    logger.info("Fetching sponsors data...")
-    sponsors_data = sheets.fetch_data(
-        sponsors, list(sponsors_columns.dict().values()), single
-    )
-    logger.info("Fetching senders data...")
-    senders_data = sheets.fetch_data(senders, [senders_column])
+    # Get the data
+    with metrics.phase("select_columns"):
+        sponsors_data = sheets.select_columns(
+            sponsors.rows, list(sponsors_columns.dict().values())
+        )
+        senders_data = sheets.select_columns(senders.rows, [senders_column])
     senders_data = senders_data[senders_column]  # Get the bare array
 
-    # Get the data based on the offset and skip
-    end = None if count is None else offset + count
-    for column in sponsors_data:
-        sponsors_data[column] = sponsors_data[column][offset:end]
-
-    # Ensure all data is the same length
-    lengths = list(map(lambda d: len(d), sponsors_data.values()))
-    total = lengths[0]
-    if not lengths.count(lengths[0]) == len(lengths):
-        raise SendException("all sponsor data columns must be the same length")
+    total = len(sponsors_data[sponsors_columns.company_name])
 
     # Check that the user REALLY wants to send emails
     click.confirm(
@@ -197,11 +675,25 @@ def run(
         abort=True,
     )
 
-    # Send all the messages
+    # Load the outcomes of any previous runs, unless testing
+    journal = None
+    journaled = {}
+    if journal_path is not None and not dry_run and overwrite is None:
+        worksheet = sponsors.worksheet
+        journal = Journal(journal_path, f"{worksheet.spreadsheet.id}/{worksheet.title}")
+        journaled = journal.replay()
+
+    # Write the new statuses to the spreadsheet as they change
+    writer = None
+    if not dry_run:
+        writer = sheets.StatusWriter(
+            sponsors.worksheet, sponsors_columns.sent_status, flush_rows, flush_interval
+        )
+
+    # Find all the messages to send
     success = 0
     skipped = 0
-    new_statuses = []
-    logger.info(f"Sending {total} messages...")
+    messages = []
     for i in range(total):
         # Get all the values from the spreadsheet
         company = sponsors_data[sponsors_columns.company_name][i]
@@ -215,7 +707,7 @@ def run(
         # Only send if no status
         if sent_status != cfg.sponsors.statuses.pending:
             logger.info(status.format("already sent"))
-            new_statuses.append(sent_status)
+            metrics.count("already_sent")
             success += 1
             continue
 
@@ -226,42 +718,81 @@ def run(
                 f" for row: {company}, {contact_name}, {contact_email}"
             )
             logger.error(status.format("failed to send"))
+            metrics.count("failed")
             skipped += 1
             continue
 
-        placeholder_values = TemplatePlaceholders(
-            company_name=company, contact_name=contact_name, sender_name=sender
-        )
+        # Ensure the message wasn't sent by an interrupted run
+        entry = journaled.get((company, contact_email))
+        if entry is not None and entry.sent:
+            logger.info(status.format(f"already sent ({entry.message_id})"))
+            if writer is not None:
+                writer.set(offset + i + 2, cfg.sponsors.statuses.sent)
+            metrics.count("already_sent")
+            success += 1
+            continue
 
-        # Format the templates
-        html = format_template(
-            cfg.template.placeholders, placeholder_values, template_html
-        )
-        text = format_template(
-            cfg.template.placeholders, placeholder_values, template_text
+        messages.append(
+            Message(
+                row=offset + i + 2,
+                status=status,
+                values=TemplatePlaceholders(
+                    company_name=company, contact_name=contact_name, sender_name=sender
+                ),
+                contact_email=contact_email if overwrite is None else overwrite,
+            )
         )
 
-        # Attempt to send the message
-        if send_message(
-            mg,
-            (text, html),
-            contact_name,
-            contact_email if overwrite is None else overwrite,
-            sender,
-            cfg.senders.reply_to,
-            cfg.sponsors.package,
-            dry_run,
-        ):
-            new_statuses.append(cfg.sponsors.statuses.sent)
-            logger.info(status.format("sent"))
-            success += 1
-        else:
-            new_statuses.append(cfg.sponsors.statuses.pending)
-            logger.error(status.format("failed to send"))
-            skipped += 1
+    # Results are reported from the workers as soon as each message finishes
+    lock = Lock()
+
+    def on_result(message: Message, sent: bool, message_id: t.Optional[str]):
+        nonlocal success, skipped
+
+        with lock:
+            if journal is not None:
+                journal.record(
+                    message.row,
+                    message.values.company_name,
+                    message.contact_email,
+                    sent,
+                    message_id,
+                )
+
+            if sent:
+                logger.info(message.status.format("sent"))
+                metrics.count("sent")
+                success += 1
+            else:
+                logger.error(message.status.format("failed to send"))
+                metrics.count("failed")
+                skipped += 1
+
+        # Writing to the sheet can take a round trip, so don't hold up the other workers
+        if sent and writer is not None:
+            writer.set(message.row, cfg.sponsors.statuses.sent)
 
-    # Write the new statuses to the spreadsheet
-    if not dry_run:
-        sheets.update_column(sponsors, sponsors_columns.sent_status, new_statuses)
+    # Send all the messages
+    logger.info(f"Sending {len(messages)} messages...")
+    archive = DryRunWriter(DRY_RUN_DIRECTORY) if dry_run else None
+    arguments = (cfg, messages, templates, package, archive, concurrency, on_result)
+    try:
+        with metrics.phase("send"):
+            if batch:
+                send_batched(*arguments, metrics, connections)
+            elif use_async:
+                asyncio.run(send_async(*arguments, metrics, connections))
+            else:
+                send_threaded(*arguments, metrics, connections)
+    finally:
+        if journal is not None:
+            journal.close()
+        if archive is not None:
+            archive.close()
+
+        # Write any remaining statuses to the spreadsheet
+        if writer is not None:
+            with metrics.phase("update_statuses"):
+                writer.flush()
 
     return success, skipped, total
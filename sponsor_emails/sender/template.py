@@ -0,0 +1,105 @@
+import gdoc
+import re
+import typing as t
+
+from .errors import TemplateException
+from ..config import TemplatePlaceholders
+
+
+class Template(object):
+    """
+    A message template compiled into a list of literal segments with slots for each placeholder. Rendering fills the
+    slots and joins the segments once.
+    """
+
+    def __init__(self, parts: t.List[str], slots: t.List[t.Tuple[int, str]]):
+        """
+        :param parts: the literal segments, with an empty string where each slot goes
+        :param slots: the index of each slot in the parts and the name of its placeholder
+        """
+        self.parts = parts
+        self.slots = slots
+
+    @classmethod
+    def from_document(
+        cls, document: gdoc.Document, placeholders: TemplatePlaceholders
+    ) -> t.Tuple["Template", "Template"]:
+        """
+        Compile the plaintext and HTML of a document. Placeholders are found in the document's structure, so they are
+        filled in even when split across differently styled runs.
+        :param document: the document to compile
+        :param placeholders: the placeholder names
+        :return: the compiled plaintext and HTML templates respectively
+        """
+        names = placeholder_names(placeholders)
+        compiled = document.compile(names.keys())
+
+        templates = []
+        for segments in (compiled.text, compiled.html):
+            unknown = unknown_placeholders(list(names.keys()), segments.parts)
+            if unknown:
+                raise TemplateException(f'unknown placeholder "{unknown[0]}"')
+
+            slots = [
+                (index, names[placeholder]) for index, placeholder in segments.slots
+            ]
+            templates.append(cls(segments.parts, slots))
+
+        return templates[0], templates[1]
+
+    def render(self, values: TemplatePlaceholders) -> str:
+        """
+        Fill in the placeholders of the template
+        :param values: the values for each placeholder
+        :return: the rendered template
+        """
+        parts = self.parts.copy()
+        for index, key in self.slots:
+            parts[index] = getattr(values, key)
+
+        return "".join(parts)
+
+
+def placeholder_names(placeholders: TemplatePlaceholders) -> t.Dict[str, str]:
+    """
+    Map each placeholder to the name of its field, ensuring no two placeholders are the same and that none contains
+    another, since it would be ambiguous which one a match in the template is for
+    :param placeholders: the placeholder names
+    :return: a mapping from placeholder to field name
+    """
+    names = {}
+    for key in placeholders.__fields__.keys():
+        placeholder = getattr(placeholders, key)
+        if placeholder in names:
+            raise TemplateException(
+                f'placeholders "{names[placeholder]}" and "{key}" are the same'
+            )
+        names[placeholder] = key
+
+    for placeholder, key in names.items():
+        for other, other_key in names.items():
+            if other != placeholder and other in placeholder:
+                raise TemplateException(
+                    f'placeholder "{other_key}" overlaps placeholder "{key}" at "{other}"'
+                )
+
+    return names
+
+
+def unknown_placeholders(placeholders: t.List[str], parts: t.List[str]) -> t.List[str]:
+    """
+    Find tokens which look like placeholders but aren't configured. Tokens only look like placeholders if all the
+    configured placeholders share the same opening and closing characters, like `{COMPANY}` and `{SENDER}`.
+    :param placeholders: the configured placeholders
+    :param parts: the literal segments of the template
+    :return: any unknown placeholders
+    """
+    opening = {placeholder[0] for placeholder in placeholders}
+    closing = {placeholder[-1] for placeholder in placeholders}
+    if len(opening) != 1 or len(closing) != 1:
+        return []
+
+    pattern = re.compile(
+        re.escape(opening.pop()) + r"[A-Za-z_][A-Za-z0-9_]*" + re.escape(closing.pop())
+    )
+    return [match for part in parts for match in pattern.findall(part)]
@@ -1,7 +1,17 @@
+from concurrent.futures import ThreadPoolExecutor
+from google.auth.exceptions import TransportError
 import gspread
+from gspread.urls import DRIVE_FILES_API_V3_URL
+from gspread.utils import absolute_range_name, extract_id_from_url
+import requests
+from threading import Lock
+import time
 import typing as t
 
+from . import logger
+from .cache import Cache
 from .config import SponsorsHeaders
+from .futures import cancel_on_error
 
 
 class MissingHeaderException(Exception):
@@ -11,28 +21,58 @@ class MissingHeaderException(Exception):
         self.header = header
 
 
+class SheetRange(t.NamedTuple):
+    """The rows to load from a worksheet"""
+
+    url: str
+    title: str
+    start: int = 2
+    end: t.Optional[int] = None
+
+
+class SheetData(t.NamedTuple):
+    """The header row and requested rows of a worksheet"""
+
+    worksheet: gspread.Worksheet
+    headers: t.List[str]
+    rows: t.List[t.List[str]]
+
+
 def index_to_label(index: int) -> str:
     """
     Map an column index to a label
     :param index: the index
     :return: the resulting label
     """
-    letter = chr(65 + (index % 26))
-    return letter * ((index // 26) + 1)
+    label = ""
+    index += 1
+    while index > 0:
+        index, remainder = divmod(index - 1, 26)
+        label = chr(65 + remainder) + label
+    return label
+
+
+def label_to_index(label: str) -> int:
+    """
+    Map a column label to an index
+    :param label: the label
+    :return: the resulting index
+    """
+    index = 0
+    for letter in label.upper():
+        index = index * 26 + ord(letter) - 64
+    return index - 1
 
 
-def map_columns_to_headers(
-    worksheet: gspread.Worksheet, names: SponsorsHeaders
-) -> SponsorsHeaders:
+def map_headers(headers: t.List[str], names: SponsorsHeaders) -> SponsorsHeaders:
     """
-    Map the column headers to columns
-    :param worksheet: the worksheet to search
+    Map the column headers from a header row to columns
+    :param headers: the header row
     :param names: the names of the columns from the config
     :return: a mapping from column to column name
     """
     mapping = {}
 
-    headers = worksheet.row_values(1)  # type: t.List[str]
     for header in names.__fields__.keys():
         name = getattr(names, header)
 
@@ -46,44 +86,286 @@ def map_columns_to_headers(
     return SponsorsHeaders.parse_obj(mapping)
 
 
-def fetch_data(
-    worksheet: gspread.Worksheet, columns: t.List[str], single: bool = False
-) -> t.Dict[str, t.List[str]]:
+def fetch_version(client: gspread.Client, key: str) -> str:
+    """
+    Get the current version of a spreadsheet from Google Drive without fetching its content
+    :param client: the authorized Google Sheets client
+    :param key: the id of the spreadsheet
+    :return: the version, which changes whenever the spreadsheet does
+    """
+    response = client.request(
+        "get",
+        f"{DRIVE_FILES_API_V3_URL}/{key}",
+        params={"fields": "version", "supportsAllDrives": True},
+    )
+    return response.json()["version"]
+
+
+def load_sheets(
+    client: gspread.Client,
+    ranges: t.List[SheetRange],
+    cache: t.Optional[Cache] = None,
+) -> t.List[SheetData]:
     """
-    Fetch the specified ranges of data and clean the values
-    :param worksheet: the worksheet to fetch from
-    :param columns: the columns of data to fetch
-    :param single: only fetch a single row
-    :return: cleaned data with an array per range
+    Load the header row and data rows of each worksheet, making a single request per spreadsheet with the spreadsheets
+    loaded concurrently. Ranges without an end fetch the whole worksheet, which the API trims to the last non-empty row.
+    :param client: the authorized Google Sheets client
+    :param ranges: the rows to load from each worksheet
+    :param cache: where to look for and store the values, revalidated against the spreadsheet's version
+    :return: the data for each range in the same order
     """
-    # Fetch the data
-    row_count = 2 if single else worksheet.row_count
-    ranges = [f"{column}2:{column}{row_count}" for column in columns]
-    raw = worksheet.batch_get(ranges)
+    # Group the ranges by spreadsheet
+    groups = {}  # type: t.Dict[str, t.List[int]]
+    for i, sheet_range in enumerate(ranges):
+        key = extract_id_from_url(sheet_range.url)
+        groups.setdefault(key, []).append(i)
 
-    # Clean the data
-    cleaned = {}
-    for i, raw_column in enumerate(raw):
-        column = []
-        for item in raw_column:
-            if len(item) == 0:
-                column.append(None)
-            else:
-                column.append(item[0])
-        cleaned[columns[i]] = column
+    # Load each spreadsheet concurrently
+    results = [None] * len(ranges)  # type: t.List[t.Optional[SheetData]]
+    with ThreadPoolExecutor(max_workers=len(groups) or 1) as executor:
+        futures = {
+            key: executor.submit(
+                load_spreadsheet, client, key, [ranges[i] for i in indexes], cache
+            )
+            for key, indexes in groups.items()
+        }
 
-    return cleaned
+        # Raise errors in the same order as the ranges were given
+        with cancel_on_error(futures.values()):
+            for key, indexes in groups.items():
+                for i, data in zip(indexes, futures[key].result()):
+                    results[i] = data
 
+    return results
 
-def update_column(worksheet: gspread.Worksheet, column: str, data: t.List[str]):
+
+def load_spreadsheet(
+    client: gspread.Client,
+    key: str,
+    ranges: t.List[SheetRange],
+    cache: t.Optional[Cache] = None,
+) -> t.List[SheetData]:
     """
-    Update a column's data
-    :param worksheet: the worksheet to update
-    :param column: the column to update
-    :param data: the data to replace the current cells with
+    Load the header row and data rows of worksheets in the same spreadsheet in a single request
+    :param client: the authorized Google Sheets client
+    :param key: the id of the spreadsheet
+    :param ranges: the rows to load from each worksheet
+    :param cache: where to look for and store the values
+    :return: the data for each range in the same order
     """
-    # Format the range and data
-    r = f"{column}2:{column}{len(data)+1}"
-    formatted = list(map(lambda v: [v], data))
+    spreadsheet = client.open_by_key(key)
+
+    # Request whole worksheets for open ranges, otherwise the header row and requested rows separately
+    requested = []
+    for sheet_range in ranges:
+        if sheet_range.end is None:
+            requested.append(absolute_range_name(sheet_range.title))
+            continue
+
+        requested.append(absolute_range_name(sheet_range.title, "1:1"))
+        if sheet_range.end >= sheet_range.start:
+            rows = f"{sheet_range.start}:{sheet_range.end}"
+            requested.append(absolute_range_name(sheet_range.title, rows))
+
+    try:
+        fetched = fetch_values(spreadsheet, requested, cache)
+    except gspread.exceptions.APIError as e:
+        raise missing_worksheet(e, [sheet_range.title for sheet_range in ranges])
+
+    # Split the values back out by worksheet
+    results = []
+    values = iter(fetched)
+    for sheet_range in ranges:
+        if sheet_range.end is None:
+            rows = next(values)
+            headers = rows[0] if rows else []
+            rows = rows[sheet_range.start - 1 :]
+        else:
+            header = next(values)
+            headers = header[0] if header else []
+            rows = next(values) if sheet_range.end >= sheet_range.start else []
+
+        worksheet = gspread.Worksheet(spreadsheet, {"title": sheet_range.title})
+        results.append(SheetData(worksheet, headers, rows))
+
+    return results
+
+
+def fetch_values(
+    spreadsheet: gspread.Spreadsheet,
+    ranges: t.List[str],
+    cache: t.Optional[Cache] = None,
+) -> t.List[t.List[t.List[str]]]:
+    """
+    Get the values of multiple ranges from a spreadsheet, using the cached values if the spreadsheet is unchanged
+    :param spreadsheet: the spreadsheet to fetch from
+    :param ranges: the absolute ranges to fetch
+    :param cache: where to look for and store the values
+    :return: the values of each range
+    """
+    key = f"sheets/{spreadsheet.id}/{'|'.join(ranges)}"
+    version = None
+    if cache is not None:
+        version = fetch_version(spreadsheet.client, spreadsheet.id)
+        values = cache.get(key, version)
+        if values is not None:
+            return values
+
+    response = spreadsheet.values_batch_get(ranges)
+    values = [
+        value_range.get("values", []) for value_range in response.get("valueRanges", [])
+    ]
+
+    if cache is not None:
+        cache.put(key, version, values)
+    return values
+
+
+def missing_worksheet(
+    error: gspread.exceptions.APIError, titles: t.List[str]
+) -> Exception:
+    """
+    Convert the error for a range which couldn't be parsed into a missing worksheet
+    :param error: the error from the API
+    :param titles: the titles of the worksheets which were requested
+    :return: the error to raise
+    """
+    message = str(error)
+    if error.response.status_code == 400 and "Unable to parse range" in message:
+        for title in titles:
+            if absolute_range_name(title) in message:
+                return gspread.exceptions.WorksheetNotFound(title)
+    return error
+
+
+def select_columns(
+    rows: t.List[t.List[str]], columns: t.List[str]
+) -> t.Dict[str, t.List[t.Optional[str]]]:
+    """
+    Select the specified columns from loaded rows and clean the values. Rows at the end without any values in the
+    selected columns are dropped.
+    :param rows: the loaded rows
+    :param columns: the columns of data to select
+    :return: cleaned data with an array per column
+    """
+    indexes = [label_to_index(column) for column in columns]
+    selected = [
+        [row[i] if i < len(row) and row[i] != "" else None for i in indexes]
+        for row in rows
+    ]
+
+    # Drop any trailing rows which only have values in other columns
+    while len(selected) != 0 and all(value is None for value in selected[-1]):
+        selected.pop()
+
+    return {column: [row[i] for row in selected] for i, column in enumerate(columns)}
+
+
+class StatusWriter(object):
+    """
+    Buffers changes to a column and periodically writes them to the sheet. Changes are flushed once enough rows have
+    changed or enough time has passed since the last write. Changes can be made from any thread, and the buffer is only
+    locked while it is swapped out, never while writing to the sheet.
+    """
+
+    def __init__(
+        self,
+        worksheet: gspread.Worksheet,
+        column: str,
+        flush_rows: int = 50,
+        flush_interval: float = 30.0,
+    ):
+        """
+        :param worksheet: the worksheet to update
+        :param column: the column to update
+        :param flush_rows: the number of changed rows to buffer before writing
+        :param flush_interval: the maximum number of seconds to buffer changes for
+        """
+        self.worksheet = worksheet
+        self.column = column
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+
+        self.lock = Lock()
+        self.pending = {}  # type: t.Dict[int, str]
+        self.last_flush = time.monotonic()
+
+    def __enter__(self) -> "StatusWriter":
+        return self
+
+    def __exit__(self, *_):
+        self.flush()
+
+    def set(self, row: int, value: str):
+        """
+        Change the value of a cell in the column
+        :param row: the row of the cell
+        :param value: the new value
+        """
+        with self.lock:
+            self.pending[row] = value
+
+            if (
+                len(self.pending) < self.flush_rows
+                and time.monotonic() - self.last_flush < self.flush_interval
+            ):
+                return
+            changes = self._take()
+
+        # Keep the changes buffered to retry on the next flush
+        try:
+            self._write(changes)
+        except (
+            gspread.exceptions.APIError,
+            requests.RequestException,
+            TransportError,
+        ) as e:
+            logger.warning(f"failed to write statuses, will retry: {e}")
+
+    def flush(self):
+        """Write all the buffered changes to the sheet"""
+        with self.lock:
+            changes = self._take()
+        self._write(changes)
+
+    def _take(self) -> t.Dict[int, str]:
+        """
+        Swap out the buffered changes, the lock must be held
+        :return: the changes to write
+        """
+        changes = self.pending
+        self.pending = {}
+        self.last_flush = time.monotonic()
+        return changes
+
+    def _write(self, changes: t.Dict[int, str]):
+        """
+        Write changes to the sheet, putting them back in the buffer if it fails
+        :param changes: the changes taken from the buffer
+        """
+        if len(changes) == 0:
+            return
+
+        # Group consecutive rows into a single range
+        data = []
+        rows = sorted(changes.keys())
+        start = rows[0]
+        for previous, row in zip(rows, rows[1:] + [None]):
+            if row == previous + 1:
+                continue
+
+            data.append(
+                {
+                    "range": f"{self.column}{start}:{self.column}{previous}",
+                    "values": [[changes[r]] for r in range(start, previous + 1)],
+                }
+            )
+            start = row
 
-    worksheet.update(r, formatted)
+        try:
+            self.worksheet.batch_update(data)
+        except BaseException:
+            # Newer changes to the same rows take precedence
+            with self.lock:
+                self.pending = {**changes, **self.pending}
+            raise
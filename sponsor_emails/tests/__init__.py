@@ -1,6 +1,6 @@
+from .clients import Clients
 from .mailgun import mailgun
+from .run import METHODS, run
 from .senders import senders
 from .sponsors import sponsors
 from .template import template
-
-METHODS = [mailgun, senders, sponsors, template]
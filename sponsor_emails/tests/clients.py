@@ -0,0 +1,52 @@
+from functools import partial
+import gdoc
+import gspread
+from threading import Lock
+import typing as t
+
+from ..cache import Cache, load_credentials
+from ..config import Config
+from ..connections import Connections
+
+
+class Clients(object):
+    """
+    The clients and connection pool shared by the tests. The credentials are loaded once and each client is only
+    created the first time it is used, so errors are still reported by the tests which need them.
+    """
+
+    def __init__(self, cfg: Config, cache: t.Optional[Cache] = None):
+        """
+        :param cfg: the configuration
+        :param cache: where to reuse the access token and unchanged copies of the documents and sheets from
+        """
+        self.cfg = cfg
+        self.cache = cache
+        self.connections = Connections(cfg.transport)
+
+        self._gdoc = None  # type: t.Optional[gdoc.Client]
+        self._gspread = None  # type: t.Optional[gspread.Client]
+        self._lock = Lock()
+
+    def gdoc(self) -> gdoc.Client:
+        """Get the Google Docs client"""
+        with self._lock:
+            if self._gdoc is None:
+                credentials = load_credentials(self.cfg.credentials, self.cache)
+                self._gdoc = gdoc.authorize(
+                    credentials, session=self.connections.google(credentials)
+                )
+            return self._gdoc
+
+    def gspread(self) -> gspread.Client:
+        """Get the Google Sheets client"""
+        with self._lock:
+            if self._gspread is None:
+                credentials = load_credentials(self.cfg.credentials, self.cache)
+                self._gspread = gspread.authorize(
+                    credentials,
+                    client_class=partial(
+                        gspread.Client, session=self.connections.google(credentials)
+                    ),
+                )
+            return self._gspread
@@ -1,21 +1,26 @@
 import mailgun as mailgun_client
 import requests
 
+from .clients import Clients
 from .result import Result
 from ..config import Config
 
 TEST_NAME = "mailgun"
 
 
-def mailgun(cfg: Config) -> Result:
+def mailgun(cfg: Config, clients: Clients) -> Result:
     """
     Test authentication and check if the domain exists for MailGun
     :param cfg: the configuration
+    :param clients: the shared clients, whose connection pool is used
     :return: status of the test
     """
     try:
         mg = mailgun_client.authorize(
-            cfg.credentials.mailgun(), cfg.credentials.mailgun_domain
+            cfg.credentials.mailgun(),
+            cfg.credentials.mailgun_domain,
+            **cfg.credentials.mailgun_options(),
+            **clients.connections.mailgun_options(),
         )
         info = mg.info()
 
@@ -13,6 +13,7 @@ class Result(BaseModel):
     status: Status
     component: str
     error_message: t.Optional[str]
+    elapsed: t.Optional[float]
 
     @classmethod
     def ok(cls, component: str) -> "Result":
@@ -28,4 +29,9 @@ class Result(BaseModel):
 
     def __str__(self):
         error = f"\n\t{self.error_message}" if self.error_message else ""
-        return f"{self.status.value}: {self.component}{error}"
+        elapsed = (
+            style(f" ({self.elapsed:.2f}s)", dim=True)
+            if self.elapsed is not None
+            else ""
+        )
+        return f"{self.status.value}: {self.component}{elapsed}{error}"
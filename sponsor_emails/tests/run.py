@@ -0,0 +1,44 @@
+from concurrent.futures import ThreadPoolExecutor
+import time
+import typing as t
+
+from .clients import Clients
+from .mailgun import mailgun
+from .result import Result
+from .senders import senders
+from .sponsors import sponsors
+from .template import template
+from ..cache import Cache
+from ..config import Config
+
+METHODS = [mailgun, senders, sponsors, template]
+
+
+def timed(
+    test: t.Callable[[Config, Clients], Result], cfg: Config, clients: Clients
+) -> Result:
+    """
+    Run a test and record how long it took
+    :param test: the test to run
+    :param cfg: the configuration
+    :param clients: the shared clients
+    :return: status of the test
+    """
+    start = time.perf_counter()
+    result = test(cfg, clients)
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def run(cfg: Config, cache: t.Optional[Cache] = None) -> t.Iterator[Result]:
+    """
+    Run all the tests at the same time, sharing the clients between them
+    :param cfg: the configuration
+    :param cache: where to reuse the access token and unchanged copies of the documents and sheets from
+    :return: the status of each test in order
+    """
+    clients = Clients(cfg, cache)
+    with ThreadPoolExecutor(max_workers=len(METHODS)) as executor:
+        futures = [executor.submit(timed, test, cfg, clients) for test in METHODS]
+        for future in futures:
+            yield future.result()
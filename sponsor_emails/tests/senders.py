@@ -1,32 +1,40 @@
+from google.auth.exceptions import RefreshError
 import gspread
 from json import JSONDecodeError
-import typing as t
 
+from .clients import Clients
 from .result import Result
+from .. import sheets
 from ..config import Config
 
 TEST_NAME = "senders"
 
 
-def senders(cfg: Config) -> Result:
+def senders(cfg: Config, clients: Clients) -> Result:
     """
     Test authentication, check the sheet exists, and check the headers exist
     :param cfg: the configuration
+    :param clients: the shared clients, and where to reuse an unchanged copy of the sheet from
     :return: status of the test
     """
     try:
         # Load the credentials
-        gs = gspread.authorize(cfg.credentials.gcp())
+        gs = clients.gspread()
     except (JSONDecodeError, KeyError, ValueError) as e:
         return Result.error(TEST_NAME, f"unable to load credentials: {e}")
+    except RefreshError as e:
+        return Result.error(TEST_NAME, f"unable to authenticate: {e}")
 
     try:
-        sheet = gs.open_by_url(cfg.senders.url)
-        worksheet = sheet.worksheet(cfg.senders.sheet)
+        # Load only the header row
+        (worksheet,) = sheets.load_sheets(
+            gs,
+            [sheets.SheetRange(cfg.senders.url, cfg.senders.sheet, 2, 1)],
+            clients.cache,
+        )
 
         # Check the column exist
-        headers = worksheet.row_values(1)  # type: t.List[str]
-        if cfg.senders.header not in headers:
+        if cfg.senders.header not in worksheet.headers:
             return Result.error(TEST_NAME, "header does not exist")
     except gspread.exceptions.APIError as e:
         if e.response.status_code == 404:
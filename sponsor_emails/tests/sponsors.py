@@ -1,6 +1,8 @@
+from google.auth.exceptions import RefreshError
 import gspread
 from json import JSONDecodeError
 
+from .clients import Clients
 from .result import Result
 from .. import sheets
 from ..config import Config
@@ -8,25 +10,31 @@ from ..config import Config
 TEST_NAME = "sponsors"
 
 
-def sponsors(cfg: Config) -> Result:
+def sponsors(cfg: Config, clients: Clients) -> Result:
     """
     Test authentication, check the sheet exists, and check the headers exist
     :param cfg: the configuration
+    :param clients: the shared clients, and where to reuse an unchanged copy of the sheet from
     :return: status of the test
     """
     try:
         # Load the credentials
-        gs = gspread.authorize(cfg.credentials.gcp())
+        gs = clients.gspread()
     except (JSONDecodeError, KeyError, ValueError) as e:
         return Result.error(TEST_NAME, f"unable to load credentials: {e}")
+    except RefreshError as e:
+        return Result.error(TEST_NAME, f"unable to authenticate: {e}")
 
     try:
-        # Open the worksheet
-        sheet = gs.open_by_url(cfg.sponsors.url)
-        worksheet = sheet.worksheet(cfg.sponsors.sheet)
+        # Load only the header row
+        (worksheet,) = sheets.load_sheets(
+            gs,
+            [sheets.SheetRange(cfg.sponsors.url, cfg.sponsors.sheet, 2, 1)],
+            clients.cache,
+        )
 
         # Check the columns exist
-        sheets.map_columns_to_headers(worksheet, cfg.sponsors.headers)
+        sheets.map_headers(worksheet.headers, cfg.sponsors.headers)
     except gspread.exceptions.APIError as e:
         if e.response.status_code == 404:
             return Result.error(TEST_NAME, "sheet not found")
@@ -1,34 +1,44 @@
 import gdoc
+from google.auth.exceptions import RefreshError
 from googleapiclient.errors import HttpError
 from json import JSONDecodeError
 
+from .clients import Clients
 from .result import Result
+from ..cache import open_document
 from ..config import Config
+from ..sender import Template, TemplateException
 
 TEST_NAME = "template"
 
 
-def template(cfg: Config) -> Result:
+def template(cfg: Config, clients: Clients) -> Result:
     """
     Test authentication, check the doc exists, and check the placeholders exist
     :param cfg: the configuration
+    :param clients: the shared clients, and where to reuse an unchanged copy of the document from
     :return: status of the test
     """
     try:
         # Load the credentials
-        gd = gdoc.authorize(cfg.credentials.gcp())
+        gd = clients.gdoc()
     except (JSONDecodeError, KeyError, ValueError) as e:
         return Result.error(TEST_NAME, f"unable to load credentials: {e}")
+    except RefreshError as e:
+        return Result.error(TEST_NAME, f"unable to authenticate: {e}")
 
     try:
         # Open the document
-        document = gd.open_by_url(cfg.template.url)
+        document = open_document(gd, cfg.template.url, clients.cache)
 
         # Check that placeholders are in document
         for key in cfg.template.placeholders.__fields__.keys():
             value = getattr(cfg.template.placeholders, key)
             if value not in document.text:
                 return Result.error(TEST_NAME, f'missing placeholder for "{key}"')
+
+        # Check that the placeholders can be filled in
+        Template.from_document(document, cfg.template.placeholders)
     except HttpError as e:
         if e.status_code == 404:
             return Result.error(TEST_NAME, "document not found")
@@ -41,5 +51,7 @@ def template(cfg: Config) -> Result:
             )
     except gdoc.NoValidIdFound:
         return Result.error(TEST_NAME, "invalid document url")
+    except TemplateException as e:
+        return Result.error(TEST_NAME, e.message)
 
     return Result.ok(TEST_NAME)